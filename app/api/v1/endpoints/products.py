@@ -3,7 +3,8 @@ API эндпоинты для работы с товарами
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
@@ -19,10 +20,14 @@ from app.schemas.product import (
     ProductFilterSchema,
     ProductSearchSchema,
     ProductStockUpdateSchema,
-    ProductStatsSchema
+    ProductStatsSchema,
+    PRODUCT_CATALOG_LIST
 )
 from app.schemas import PaginatedResponseSchema, StatusResponseSchema
 from app.services.product_service import ProductService
+from app.services.cache import (
+    catalog_cache_key, cache_get_text, cache_set_text, CATALOG_TTL_SECONDS
+)
 
 
 router = APIRouter()
@@ -65,22 +70,42 @@ async def get_products_catalog(
             is_hidden=False     # Только видимые товары
         )
 
+        # Кэш готовых страниц каталога: ключ версионирован,
+        # мутации товаров инвалидируют все страницы одним INCR
+        cache_key = await catalog_cache_key(filters.model_dump(), include_hidden=False)
+        if cache_key:
+            cached_body = await cache_get_text(cache_key)
+            if cached_body is not None:
+                return Response(content=cached_body, media_type="application/json")
+
         # Получаем товары через сервис
         product_service = ProductService(session)
         result = await product_service.get_products_catalog(filters, include_hidden=False)
 
-        # Преобразуем в схемы каталога
-        catalog_items = [
-            ProductCatalogSchema.model_validate(product)
-            for product in result["products"]
-        ]
+        # Преобразуем в схемы каталога (без валидации — строки из БД
+        # доверенные) и дампим всю страницу одним Rust-проходом,
+        # чтобы jsonable_encoder не обходил каждую модель по полям
+        catalog_items = PRODUCT_CATALOG_LIST.dump_python(
+            [
+                ProductCatalogSchema.from_row(product)
+                for product in result["products"]
+            ],
+            mode="json"
+        )
 
         logger.info(f"📦 Каталог запрошен: {len(catalog_items)} товаров, страница {page}")
 
-        return PaginatedResponseSchema(
+        # Готовый Response: сериализация страницы целиком в Rust,
+        # без повторной валидации response_model
+        body = PaginatedResponseSchema(
             items=catalog_items,
             pagination=result["pagination"]
-        )
+        ).model_dump_json()
+
+        if cache_key:
+            await cache_set_text(cache_key, body, CATALOG_TTL_SECONDS)
+
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
         logger.error(f"❌ Ошибка получения каталога: {e}")
@@ -123,7 +148,12 @@ async def get_product_details(
 
         logger.info(f"📦 Запрошен товар: {product.name} (ID: {product_id})")
 
-        return ProductResponseSchema.model_validate(product)
+        # model_dump_json сериализует в Rust (Decimal/datetime включая),
+        # готовый Response минует jsonable_encoder FastAPI
+        return Response(
+            content=ProductResponseSchema.model_validate(product).model_dump_json(),
+            media_type="application/json"
+        )
 
     except HTTPException:
         raise
@@ -137,9 +167,10 @@ async def get_product_details(
 
 @router.post(
     "/search",
-    response_model=List[ProductCatalogSchema],
+    response_model=None,
     summary="Поиск товаров",
-    description="Поиск товаров по названию, описанию и тегам"
+    description="Поиск товаров по названию, описанию и тегам. "
+                "Формат элементов совпадает с ProductCatalogSchema"
 )
 async def search_products(
     search_data: ProductSearchSchema,
@@ -168,15 +199,16 @@ async def search_products(
                 search_data.limit
             )
 
-        # Преобразуем в схемы каталога
-        search_results = [
-            ProductCatalogSchema.model_validate(product)
-            for product in products
-        ]
+        # Core-строки из сервиса: собираем схемы без валидации
+        # и дампим список одним проходом, минуя jsonable_encoder
+        search_results = PRODUCT_CATALOG_LIST.dump_python(
+            [ProductCatalogSchema.from_row(product) for product in products],
+            mode="json"
+        )
 
         logger.info(f"🔍 Поиск '{search_data.query}': найдено {len(search_results)} товаров")
 
-        return search_results
+        return ORJSONResponse(content=search_results)
 
     except Exception as e:
         logger.error(f"❌ Ошибка поиска товаров: {e}")
@@ -500,13 +532,15 @@ async def upload_product_image(
                 detail="Файл слишком большой. Максимальный размер: 10MB"
             )
 
-        # Читаем данные файла
-        image_data = await image.read()
+        # Передаем файл в сервис потоком: чанки не буферизуются
+        # в памяти целиком на время приема от клиента
+        async def image_chunks():
+            while chunk := await image.read(1024 * 1024):
+                yield chunk
 
-        # Сохраняем через сервис
         product_service = ProductService(session)
-        file_path = await product_service.save_product_image(
-            product_id, image_data, image.filename
+        file_path = await product_service.save_product_image_stream(
+            product_id, image_chunks(), image.filename
         )
 
         if not file_path:
@@ -19,10 +19,24 @@ engine = create_async_engine(
     str(settings.DATABASE_URL),
     echo=settings.DEBUG,  # Логирование SQL запросов в debug режиме
     future=True,
-    pool_pre_ping=True,  # Проверка соединения перед использованием
-    pool_recycle=3600,  # Переподключение каждый час
+    pool_size=20,  # Базовый размер пула под конкурентную нагрузку
+    max_overflow=10,  # Запас соединений на пики
+    pool_pre_ping=False,  # Лишний round-trip на каждый checkout не нужен
+    pool_recycle=1800,  # Переподключение каждые 30 минут
+    pool_use_lifo=True,  # Горячие соединения переиспользуются первыми
+    connect_args={
+        # Кэш prepared statements: повторяющиеся параметризованные
+        # запросы каталога минуют parse/plan на сервере
+        "prepared_statement_cache_size": 1024,
+        "server_settings": {"jit": "off"},  # JIT вредит коротким OLTP-запросам
+    },
 )
 
+
+def get_pool_status() -> str:
+    """Текущее состояние пула соединений (для health-check)"""
+    return engine.pool.status()
+
 # Создание фабрики сессий
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -5,10 +5,49 @@
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 from app.core.database import Base
 
 
+def with_product_loads(query):
+    """
+    Явная загрузка коллекций товара для запросов, которым они нужны
+
+    Коллекции Product объявлены с lazy="raise_on_sql": по умолчанию
+    дополнительные SELECT не выполняются, а маршруты, которым нужны
+    связи, подключают их этим хелпером. raiseload("*") служит
+    предохранителем от незамеченных ленивых загрузок.
+    """
+    from app.models.product import Product
+    return query.options(
+        selectinload(Product.cart_items),
+        selectinload(Product.order_items),
+        raiseload("*")
+    )
+
+
+def with_user_loads(query):
+    """Явная загрузка коллекций пользователя (см. with_product_loads)"""
+    from app.models.user import User
+    return query.options(
+        selectinload(User.orders),
+        selectinload(User.cart_items),
+        selectinload(User.promocode_usages),
+        raiseload("*")
+    )
+
+
+def with_promocode_loads(query):
+    """Явная загрузка связей промокода (см. with_product_loads)"""
+    from app.models.promocode import Promocode
+    return query.options(
+        selectinload(Promocode.usages),
+        selectinload(Promocode.orders),
+        selectinload(Promocode.creator),
+        raiseload("*")
+    )
+
+
 class DatabaseManager:
     """Менеджер для общих операций с базой данных"""
 
@@ -8,7 +8,7 @@ import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from loguru import logger
 
 from app.core.config import settings, telegram_settings
@@ -91,6 +91,15 @@ async def lifespan(app: FastAPI):
         # Инициализация других сервисов
         logger.info("🔧 Инициализация сервисов...")
 
+        # Прогрев Pydantic-схем, чтобы первый запрос не платил
+        # за ленивую сборку core-схем
+        from app.schemas._warmup import warmup_schemas
+        warmup_schemas()
+
+        # Фоновый сброс счетчиков просмотров
+        from app.services.view_counter import start_view_counter
+        start_view_counter()
+
         # TODO: Инициализация Telegram бота
         # TODO: Инициализация планировщика задач
         # TODO: Инициализация Redis
@@ -109,6 +118,12 @@ async def lifespan(app: FastAPI):
 
     try:
         # Корректное закрытие соединений
+        from app.services.view_counter import stop_view_counter
+        await stop_view_counter()
+
+        from app.services.cache import close_redis
+        await close_redis()
+
         # TODO: Остановка Telegram бота
         # TODO: Закрытие Redis соединений
         # TODO: Остановка планировщика
@@ -129,6 +144,7 @@ def create_application() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
+        default_response_class=ORJSONResponse,  # Rust-сериализация JSON-ответов
         lifespan=lifespan
     )
 
@@ -198,11 +214,14 @@ app = create_application()
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Проверка здоровья приложения"""
+    from app.core.database import get_pool_status
+
     return {
         "status": "healthy",
         "service": settings.PROJECT_NAME,
         "version": settings.VERSION,
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "db_pool": get_pool_status()
     }
 
 
@@ -22,7 +22,7 @@ class Cart(Base):
 
     __tablename__ = "carts"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # Связь с пользователем
     user_id: Mapped[int] = mapped_column(
@@ -67,7 +67,7 @@ class CartItem(Base):
 
     __tablename__ = "cart_items"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # Связи
     user_id: Mapped[int] = mapped_column(
@@ -44,7 +44,7 @@ class Delivery(Base):
     __tablename__ = "deliveries"
 
     # Основные поля
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # Связь с заказом
     order_id: Mapped[int] = mapped_column(
@@ -56,14 +56,24 @@ class Delivery(Base):
 
     # Провайдер доставки
     provider: Mapped[DeliveryProvider] = mapped_column(
-        Enum(DeliveryProvider),
+        Enum(
+            DeliveryProvider,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         default=DeliveryProvider.CDEK,
         comment="Служба доставки"
     )
 
     # Статус доставки
     status: Mapped[DeliveryStatus] = mapped_column(
-        Enum(DeliveryStatus),
+        Enum(
+            DeliveryStatus,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         default=DeliveryStatus.CREATED,
         index=True,
         comment="Статус доставки"
@@ -9,10 +9,15 @@ from typing import Optional, List
 from decimal import Decimal
 from sqlalchemy import (
     String, Text, Boolean, DateTime, Integer,
-    Numeric, ForeignKey, func, Index, Enum
+    Numeric, ForeignKey, func, Index, Enum, insert, event
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
+from app.models.payment import PaymentMethod, PaymentStatus
+
+# Таблица замены разделителя тысяч: один проход по строке на C-уровне
+_THOUSANDS_SEP_TABLE = str.maketrans(",", " ")
 
 
 class OrderStatus(enum.Enum):
@@ -28,22 +33,26 @@ class OrderStatus(enum.Enum):
     RETURNED = "returned"  # Возврат
 
 
-class PaymentMethod(enum.Enum):
-    """Способы оплаты"""
-    USDT_TRC20 = "usdt_trc20"
-    USDT_BEP20 = "usdt_bep20"
-    USDT_TON = "usdt_ton"
-    SBP = "sbp"
-
-
-class PaymentStatus(enum.Enum):
-    """Статусы оплаты"""
-    PENDING = "pending"  # Ожидает
-    PROCESSING = "processing"  # Обрабатывается
-    COMPLETED = "completed"  # Завершена
-    FAILED = "failed"  # Неуспешна
-    CANCELLED = "cancelled"  # Отменена
-    REFUNDED = "refunded"  # Возврат
+# Человекочитаемые статусы и способы оплаты: константы уровня модуля
+# вместо словарей-литералов на каждый вызов display-свойств
+_ORDER_STATUS_DISPLAY = {
+    OrderStatus.PENDING_PAYMENT: "Ожидает оплаты",
+    OrderStatus.PAYMENT_PROCESSING: "Обработка платежа",
+    OrderStatus.PAID: "Оплачен",
+    OrderStatus.CONFIRMED: "Подтвержден",
+    OrderStatus.ASSEMBLING: "Собирается",
+    OrderStatus.SHIPPED: "Отправлен",
+    OrderStatus.DELIVERED: "Доставлен",
+    OrderStatus.CANCELLED: "Отменен",
+    OrderStatus.RETURNED: "Возврат"
+}
+
+_PAYMENT_METHOD_DISPLAY = {
+    PaymentMethod.USDT_TRC20: "USDT (TRC-20)",
+    PaymentMethod.USDT_BEP20: "USDT (BEP-20)",
+    PaymentMethod.USDT_TON: "USDT (TON)",
+    PaymentMethod.SBP: "СБП"
+}
 
 
 class Order(Base):
@@ -52,7 +61,7 @@ class Order(Base):
     __tablename__ = "orders"
 
     # Основные поля
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     order_number: Mapped[str] = mapped_column(
         String(50),
@@ -70,14 +79,24 @@ class Order(Base):
 
     # Статусы
     status: Mapped[OrderStatus] = mapped_column(
-        Enum(OrderStatus),
+        Enum(
+            OrderStatus,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         default=OrderStatus.PENDING_PAYMENT,
         index=True,
         comment="Статус заказа"
     )
 
     payment_status: Mapped[PaymentStatus] = mapped_column(
-        Enum(PaymentStatus),
+        Enum(
+            PaymentStatus,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         default=PaymentStatus.PENDING,
         index=True,
         comment="Статус оплаты"
@@ -173,7 +192,12 @@ class Order(Base):
 
     # Оплата
     payment_method: Mapped[Optional[PaymentMethod]] = mapped_column(
-        Enum(PaymentMethod),
+        Enum(
+            PaymentMethod,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         nullable=True,
         comment="Способ оплаты"
     )
@@ -255,15 +279,18 @@ class Order(Base):
     )
 
     # Дополнительная информация
+    # Текстовые блобы не нужны в списках — загружаем отложенно по обращению
     notes: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
+        deferred=True,
         comment="Заметки к заказу"
     )
 
     admin_notes: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
+        deferred=True,
         comment="Заметки администратора"
     )
 
@@ -342,23 +369,12 @@ class Order(Base):
     @property
     def display_total(self) -> str:
         """Возвращает общую сумму в читаемом формате"""
-        return f"{self.total_amount:,.2f} ₽".replace(",", " ")
+        return f"{self.total_amount:,.2f} ₽".translate(_THOUSANDS_SEP_TABLE)
 
     @property
     def status_display(self) -> str:
         """Возвращает человекочитаемый статус заказа"""
-        status_map = {
-            OrderStatus.PENDING_PAYMENT: "Ожидает оплаты",
-            OrderStatus.PAYMENT_PROCESSING: "Обработка платежа",
-            OrderStatus.PAID: "Оплачен",
-            OrderStatus.CONFIRMED: "Подтвержден",
-            OrderStatus.ASSEMBLING: "Собирается",
-            OrderStatus.SHIPPED: "Отправлен",
-            OrderStatus.DELIVERED: "Доставлен",
-            OrderStatus.CANCELLED: "Отменен",
-            OrderStatus.RETURNED: "Возврат"
-        }
-        return status_map.get(self.status, self.status.value)
+        return _ORDER_STATUS_DISPLAY.get(self.status, self.status.value)
 
     @property
     def payment_method_display(self) -> str:
@@ -366,23 +382,24 @@ class Order(Base):
         if not self.payment_method:
             return "Не выбран"
 
-        method_map = {
-            PaymentMethod.USDT_TRC20: "USDT (TRC-20)",
-            PaymentMethod.USDT_BEP20: "USDT (BEP-20)",
-            PaymentMethod.USDT_TON: "USDT (TON)",
-            PaymentMethod.SBP: "СБП"
-        }
-        return method_map.get(self.payment_method, self.payment_method.value)
+        return _PAYMENT_METHOD_DISPLAY.get(self.payment_method, self.payment_method.value)
 
     def generate_order_number(self) -> str:
         """Генерирует уникальный номер заказа"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"ORD-{timestamp}-{self.id or 'NEW'}"
+        from app.utils.helpers import compact_timestamp
+        return f"ORD-{compact_timestamp()}-{self.id or 'NEW'}"
 
     def calculate_totals(self) -> None:
         """Пересчитывает общую сумму заказа"""
-        self.subtotal = sum(item.total_price for item in self.items)
+        # У несохраненных позиций total_price заполняется только
+        # событием before_insert при flush — до этого считаем сумму
+        # из цены и количества
+        self.subtotal = sum(
+            item.total_price
+            if item.total_price is not None
+            else item.product_price * item.quantity
+            for item in self.items
+        )
         self.total_amount = self.subtotal + self.delivery_cost - self.discount_amount
 
     def apply_promocode_discount(self, promocode_discount_percent: int) -> None:
@@ -398,7 +415,7 @@ class OrderItem(Base):
 
     __tablename__ = "order_items"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # Связи
     order_id: Mapped[int] = mapped_column(
@@ -432,6 +449,13 @@ class OrderItem(Base):
         comment="Количество товара"
     )
 
+    # Хранится в БД, а не считается в Python: заполняется при вставке
+    total_price: Mapped[Decimal] = mapped_column(
+        Numeric(10, 2),
+        nullable=False,
+        comment="Общая стоимость позиции (цена x количество)"
+    )
+
     # Временные метки
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -451,20 +475,69 @@ class OrderItem(Base):
         lazy="selectin"
     )
 
+    # Индексы
+    __table_args__ = (
+        # Покрывающий индекс: selectin-загрузка Order.items отвечает
+        # index-only сканом без обращения к heap
+        Index(
+            "idx_order_items_order_covering",
+            "order_id",
+            postgresql_include=["product_id", "product_name", "product_price", "quantity"]
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<OrderItem(id={self.id}, order_id={self.order_id}, product={self.product_name}, qty={self.quantity})>"
 
-    @property
-    def total_price(self) -> Decimal:
-        """Общая стоимость позиции"""
-        return self.product_price * self.quantity
+    @classmethod
+    async def bulk_create(
+            cls,
+            session: AsyncSession,
+            order_id: int,
+            rows: List[dict]
+    ) -> List[int]:
+        """
+        Массовая вставка позиций заказа одним INSERT
+
+        Обходит создание ORM-объектов и unit-of-work цикл на каждую
+        позицию: заказ сохраняется первым, позиции вставляются напрямую
+        по order_id без back-population связей.
+
+        Args:
+            session: Сессия базы данных
+            order_id: ID сохраненного заказа
+            rows: Список словарей с полями позиции
+                  (product_id, product_name, product_price, quantity)
+
+        Returns:
+            Список ID созданных позиций
+        """
+        values = []
+        for row in rows:
+            row = {"order_id": order_id, **row}
+            row.setdefault("total_price", row["product_price"] * row["quantity"])
+            values.append(row)
+
+        result = await session.execute(
+            insert(cls).returning(cls.id),
+            values
+        )
+        return list(result.scalars().all())
 
     @property
     def display_price(self) -> str:
         """Цена товара в читаемом формате"""
-        return f"{self.product_price:,.2f} ₽".replace(",", " ")
+        return f"{self.product_price:,.2f} ₽".translate(_THOUSANDS_SEP_TABLE)
 
     @property
     def display_total(self) -> str:
         """Общая стоимость в читаемом формате"""
-        return f"{self.total_price:,.2f} ₽".replace(",", " ")
\ No newline at end of file
+        return f"{self.total_price:,.2f} ₽".translate(_THOUSANDS_SEP_TABLE)
+
+
+@event.listens_for(OrderItem, "before_insert")
+@event.listens_for(OrderItem, "before_update")
+def _fill_order_item_total(mapper, connection, target: OrderItem) -> None:
+    """Заполняет total_price позиции при сохранении через ORM"""
+    if target.product_price is not None and target.quantity is not None:
+        target.total_price = target.product_price * target.quantity
\ No newline at end of file
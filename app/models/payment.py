@@ -14,6 +14,9 @@ from sqlalchemy import (
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
+# Предвычисленные "копейки" 0.01-0.99 USDT для генерации уникальных сумм
+_CENT_OFFSETS = tuple(Decimal(i).scaleb(-2) for i in range(1, 100))
+
 
 class PaymentMethod(enum.Enum):
     """Способы оплаты"""
@@ -42,13 +45,34 @@ class BlockchainNetwork(enum.Enum):
     TON = "ton"
 
 
+# Человекочитаемые статусы и способы оплаты: константы уровня модуля
+# вместо словарей-литералов на каждый вызов display-свойств
+_PAYMENT_STATUS_DISPLAY = {
+    PaymentStatus.PENDING: "Ожидает оплаты",
+    PaymentStatus.PROCESSING: "Обрабатывается",
+    PaymentStatus.CHECKING: "Проверяется",
+    PaymentStatus.COMPLETED: "Оплачен",
+    PaymentStatus.FAILED: "Неуспешен",
+    PaymentStatus.CANCELLED: "Отменен",
+    PaymentStatus.EXPIRED: "Истек",
+    PaymentStatus.REFUNDED: "Возвращен"
+}
+
+_PAYMENT_METHOD_DISPLAY = {
+    PaymentMethod.USDT_TRC20: "USDT (TRC-20)",
+    PaymentMethod.USDT_BEP20: "USDT (BEP-20)",
+    PaymentMethod.USDT_TON: "USDT (TON)",
+    PaymentMethod.SBP: "Система быстрых платежей"
+}
+
+
 class Payment(Base):
     """Модель платежа"""
 
     __tablename__ = "payments"
 
     # Основные поля
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     payment_id: Mapped[str] = mapped_column(
         String(100),
@@ -73,13 +97,23 @@ class Payment(Base):
 
     # Способ оплаты и статус
     payment_method: Mapped[PaymentMethod] = mapped_column(
-        Enum(PaymentMethod),
+        Enum(
+            PaymentMethod,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         nullable=False,
         comment="Способ оплаты"
     )
 
     status: Mapped[PaymentStatus] = mapped_column(
-        Enum(PaymentStatus),
+        Enum(
+            PaymentStatus,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         default=PaymentStatus.PENDING,
         index=True,
         comment="Статус платежа"
@@ -121,7 +155,12 @@ class Payment(Base):
     )
 
     blockchain_network: Mapped[Optional[BlockchainNetwork]] = mapped_column(
-        Enum(BlockchainNetwork),
+        Enum(
+            BlockchainNetwork,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         nullable=True,
         comment="Блокчейн сеть"
     )
@@ -146,9 +185,11 @@ class Payment(Base):
         comment="ID заказа в системе СБП"
     )
 
+    # QR может быть base64-картинкой в несколько КБ — загружаем отложенно
     sbp_qr_code: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
+        deferred=True,
         comment="QR код для оплаты СБП"
     )
 
@@ -184,22 +225,25 @@ class Payment(Base):
         comment="Время подтверждения платежа"
     )
 
-    # Дополнительные данные
+    # Дополнительные данные (не нужны в списках — загружаем отложенно)
     provider_data: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
+        deferred=True,
         comment="Дополнительные данные от провайдера (JSON)"
     )
 
     failure_reason: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
+        deferred=True,
         comment="Причина неуспешного платежа"
     )
 
     notes: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
+        deferred=True,
         comment="Заметки к платежу"
     )
 
@@ -281,28 +325,12 @@ class Payment(Base):
     @property
     def status_display(self) -> str:
         """Возвращает человекочитаемый статус платежа"""
-        status_map = {
-            PaymentStatus.PENDING: "Ожидает оплаты",
-            PaymentStatus.PROCESSING: "Обрабатывается",
-            PaymentStatus.CHECKING: "Проверяется",
-            PaymentStatus.COMPLETED: "Оплачен",
-            PaymentStatus.FAILED: "Неуспешен",
-            PaymentStatus.CANCELLED: "Отменен",
-            PaymentStatus.EXPIRED: "Истек",
-            PaymentStatus.REFUNDED: "Возвращен"
-        }
-        return status_map.get(self.status, self.status.value)
+        return _PAYMENT_STATUS_DISPLAY.get(self.status, self.status.value)
 
     @property
     def method_display(self) -> str:
         """Возвращает человекочитаемый способ оплаты"""
-        method_map = {
-            PaymentMethod.USDT_TRC20: "USDT (TRC-20)",
-            PaymentMethod.USDT_BEP20: "USDT (BEP-20)",
-            PaymentMethod.USDT_TON: "USDT (TON)",
-            PaymentMethod.SBP: "Система быстрых платежей"
-        }
-        return method_map.get(self.payment_method, self.payment_method.value)
+        return _PAYMENT_METHOD_DISPLAY.get(self.payment_method, self.payment_method.value)
 
     @property
     def blockchain_explorer_url(self) -> Optional[str]:
@@ -320,12 +348,12 @@ class Payment(Base):
 
     def generate_payment_id(self) -> str:
         """Генерирует уникальный ID платежа"""
-        from datetime import datetime
         import secrets
 
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        from app.utils.helpers import compact_timestamp
+
         random_part = secrets.token_hex(4).upper()
-        return f"PAY-{timestamp}-{random_part}"
+        return f"PAY-{compact_timestamp()}-{random_part}"
 
     def generate_unique_amount(self, base_amount: Decimal) -> Decimal:
         """
@@ -337,11 +365,10 @@ class Payment(Base):
         Returns:
             Decimal: Уникальная сумма
         """
-        import random
+        import secrets
 
-        # Добавляем случайные копейки (0.01-0.99 USDT)
-        random_cents = Decimal(random.randint(1, 99)) / 100
-        return base_amount + random_cents
+        # Добавляем случайные копейки (0.01-0.99 USDT) из предвычисленного набора
+        return base_amount + _CENT_OFFSETS[secrets.randbelow(len(_CENT_OFFSETS))]
 
     def set_expiration(self, minutes: int = 30) -> None:
         """
@@ -8,10 +8,20 @@ from typing import Optional, List
 from decimal import Decimal
 from sqlalchemy import (
     String, Text, Boolean, DateTime, Integer,
-    Numeric, func, Index
+    Numeric, func, Index, text, Computed, update
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
+from app.core.config import marketplace_settings
+
+# Настройки неизменны на время жизни процесса — фиксируем порог константой,
+# чтобы не платить за импорт и разрешение атрибутов на каждый вызов
+_LOW_STOCK_THRESHOLD = marketplace_settings.LOW_STOCK_THRESHOLD
+
+# Таблица замены разделителя тысяч: один проход по строке на C-уровне
+_THOUSANDS_SEP_TABLE = str.maketrans(",", " ")
 
 
 class Product(Base):
@@ -20,7 +30,7 @@ class Product(Base):
     __tablename__ = "products"
 
     # Основные поля
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     name: Mapped[str] = mapped_column(
         String(500),
@@ -54,6 +64,32 @@ class Product(Base):
         comment="Путь к файлу изображения на сервере"
     )
 
+    # Метаданные изображения: пишутся при загрузке, чтобы чтение
+    # информации о файле обходилось без файловой системы и PIL
+    image_width: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Ширина изображения в пикселях"
+    )
+
+    image_height: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Высота изображения в пикселях"
+    )
+
+    image_size_bytes: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Размер файла изображения в байтах"
+    )
+
+    image_format: Mapped[Optional[str]] = mapped_column(
+        String(10),
+        nullable=True,
+        comment="Формат файла изображения (JPEG, PNG, WEBP)"
+    )
+
     detail_url: Mapped[Optional[str]] = mapped_column(
         String(1000),
         nullable=True,
@@ -99,6 +135,19 @@ class Product(Base):
         comment="Теги для поиска (через запятую)"
     )
 
+    # Хранимый tsvector по названию, описанию и тегам для полнотекстового
+    # поиска; генерируется и обновляется на стороне БД
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('russian', coalesce(name, '') || ' ' || "
+            "coalesce(description, '') || ' ' || coalesce(tags, ''))",
+            persisted=True
+        ),
+        nullable=True,
+        comment="Вектор полнотекстового поиска"
+    )
+
     # Характеристики товара
     weight: Mapped[Optional[Decimal]] = mapped_column(
         Numeric(8, 3),
@@ -138,6 +187,15 @@ class Product(Base):
         comment="Количество заказов этого товара"
     )
 
+    # Материализованная популярность: считается и обновляется на
+    # стороне БД, сортировка рекомендуемых идет по индексу без
+    # вычисления выражения на каждую строку
+    popularity: Mapped[int] = mapped_column(
+        Integer,
+        Computed("views_count + orders_count * 10", persisted=True),
+        comment="Популярность товара (просмотры + заказы * 10)"
+    )
+
     # Служебная информация
     notes: Mapped[Optional[str]] = mapped_column(
         Text,
@@ -163,21 +221,75 @@ class Product(Base):
     cart_items: Mapped[List["CartItem"]] = relationship(
         "CartItem",
         back_populates="product",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     order_items: Mapped[List["OrderItem"]] = relationship(
         "OrderItem",
         back_populates="product",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
+    # Серверные default'ы и generated-колонки (id, created_at, popularity,
+    # search_vector) возвращаются в INSERT ... RETURNING — после commit
+    # не нужен refresh-SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     # Индексы для оптимизации запросов
     __table_args__ = (
-        Index("idx_product_availability", "is_available", "is_hidden"),
+        # Частичный покрывающий индекс под горячий шаблон каталога:
+        # WHERE is_hidden=false ORDER BY sort_order, created_at DESC.
+        # Предикат — только is_hidden: каталог по умолчанию не фильтрует
+        # is_available, и более строгий предикат не позволял планировщику
+        # использовать индекс. INCLUDE дает index-only scan без heap.
+        # Заменяет прежний idx_product_catalog_cover
+        Index(
+            "idx_product_catalog_visible",
+            "sort_order",
+            text("created_at DESC"),
+            postgresql_include=["name", "price", "image_url", "stock_quantity", "category"],
+            postgresql_where=text("is_hidden = false")
+        ),
+        # Листинг категории: WHERE category = ... ORDER BY sort_order
+        Index(
+            "idx_product_category_visible",
+            "category",
+            "sort_order",
+            postgresql_where=text("is_hidden = false AND is_available = true")
+        ),
+        # Рекомендуемые: сортировка по generated-колонке популярности
+        Index(
+            "idx_product_featured",
+            text("popularity DESC"),
+            text("created_at DESC"),
+            postgresql_where=text(
+                "is_hidden = false AND is_available = true AND stock_quantity > 0"
+            )
+        ),
         Index("idx_product_category", "category"),
-        Index("idx_product_sort", "sort_order"),
-        Index("idx_product_stock", "stock_quantity"),
+        # Низкие остатки: WHERE is_available AND stock_quantity > 0
+        # ORDER BY stock_quantity — частичный индекс отдает строки уже
+        # отсортированными, INCLUDE позволяет index-only scan.
+        # Заменяет прежний полный idx_product_stock
+        Index(
+            "idx_product_low_stock",
+            "stock_quantity",
+            postgresql_include=["name", "price"],
+            postgresql_where=text("is_available = true AND stock_quantity > 0")
+        ),
+        # Триграммные GIN-индексы для подстрочного поиска ILIKE '%...%'
+        # (требуют расширения pg_trgm: CREATE EXTENSION IF NOT EXISTS pg_trgm)
+        Index(
+            "idx_product_name_trgm",
+            text("lower(name) gin_trgm_ops"),
+            postgresql_using="gin"
+        ),
+        Index(
+            "idx_product_tags_trgm",
+            text("lower(tags) gin_trgm_ops"),
+            postgresql_using="gin"
+        ),
+        Index("idx_product_fts", "search_vector", postgresql_using="gin"),
     )
 
     def __repr__(self) -> str:
@@ -190,9 +302,8 @@ class Product(Base):
 
     @property
     def is_low_stock(self) -> bool:
-        """Проверяет, заканчивается ли товар (< 30 штук)"""
-        from app.core.config import marketplace_settings
-        return self.stock_quantity < marketplace_settings.LOW_STOCK_THRESHOLD
+        """Проверяет, заканчивается ли товар (меньше порога из настроек)"""
+        return self.stock_quantity < _LOW_STOCK_THRESHOLD
 
     @property
     def is_purchasable(self) -> bool:
@@ -206,7 +317,12 @@ class Product(Base):
     @property
     def display_price(self) -> str:
         """Возвращает цену в читаемом формате"""
-        return f"{self.price:,.2f} ₽".replace(",", " ")
+        return f"{self.price:,.2f} ₽".translate(_THOUSANDS_SEP_TABLE)
+
+    @property
+    def price_cents(self) -> int:
+        """Цена в копейках — для быстрых целочисленных расчетов сумм"""
+        return int(self.price * 100)
 
     @property
     def stock_status(self) -> str:
@@ -257,27 +373,47 @@ class Product(Base):
 
         return max(0, max_qty)
 
-    async def update_stock(self, quantity_change: int) -> bool:
+    async def update_stock(self, session: AsyncSession, quantity_change: int) -> bool:
         """
-        Обновляет количество товара на складе
+        Атомарно обновляет количество товара на складе
+
+        Проверка "не уйти в минус" выполняется на стороне БД одним
+        условным UPDATE: нет окна между чтением и записью, гонки
+        конкурентных заказов исключены.
 
         Args:
+            session: Сессия базы данных
             quantity_change: Изменение количества (может быть отрицательным)
 
         Returns:
             bool: Успешно ли обновлено
         """
-        new_quantity = self.stock_quantity + quantity_change
+        result = await session.execute(
+            update(Product)
+            .where(
+                Product.id == self.id,
+                Product.stock_quantity + quantity_change >= 0
+            )
+            .values(stock_quantity=Product.stock_quantity + quantity_change)
+            .returning(Product.stock_quantity)
+        )
+        new_quantity = result.scalar_one_or_none()
 
-        if new_quantity < 0:
+        if new_quantity is None:
             return False
 
         self.stock_quantity = new_quantity
         return True
 
     def increment_views(self) -> None:
-        """Увеличивает счетчик просмотров"""
-        self.views_count += 1
+        """
+        Увеличивает счетчик просмотров
+
+        Инкремент буферизуется в памяти и пишется в БД пачкой
+        фоновой задачей (см. app.services.view_counter).
+        """
+        from app.services.view_counter import record_view
+        record_view(self.id)
 
     def increment_orders(self) -> None:
         """Увеличивает счетчик заказов"""
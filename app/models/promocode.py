@@ -4,17 +4,28 @@
 """
 
 import enum
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
 from decimal import Decimal
 from sqlalchemy import (
-    String, Text, Boolean, DateTime, Integer,
-    Numeric, ForeignKey, func, Index, Enum, UniqueConstraint
+    String, Text, Boolean, DateTime, Integer, Numeric, ForeignKey,
+    func, Index, Enum, UniqueConstraint, select, text, update, case, and_, or_
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 
+def _to_kop(amount: Decimal) -> int:
+    """Переводит рублевую сумму в целые копейки"""
+    return int(amount * 100)
+
+
+def _from_kop(kopecks: int) -> Decimal:
+    """Переводит копейки обратно в Decimal с двумя знаками"""
+    return Decimal(kopecks).scaleb(-2)
+
+
 class PromocodeStatus(enum.Enum):
     """Статусы промокода"""
     ACTIVE = "active"  # Активен
@@ -23,13 +34,23 @@ class PromocodeStatus(enum.Enum):
     EXHAUSTED = "exhausted"  # Исчерпан (закончились активации)
 
 
+# Человекочитаемые статусы: константа уровня модуля вместо
+# словаря-литерала на каждый вызов status_display
+_STATUS_DISPLAY = {
+    PromocodeStatus.ACTIVE: "Активен",
+    PromocodeStatus.INACTIVE: "Неактивен",
+    PromocodeStatus.EXPIRED: "Истек",
+    PromocodeStatus.EXHAUSTED: "Исчерпан"
+}
+
+
 class Promocode(Base):
     """Модель промокода"""
 
     __tablename__ = "promocodes"
 
     # Основные поля
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     code: Mapped[str] = mapped_column(
         String(50),
@@ -104,7 +125,12 @@ class Promocode(Base):
 
     # Статус и управление
     status: Mapped[PromocodeStatus] = mapped_column(
-        Enum(PromocodeStatus),
+        Enum(
+            PromocodeStatus,
+            native_enum=False,
+            length=32,
+            values_callable=lambda e: [member.value for member in e]
+        ),
         default=PromocodeStatus.ACTIVE,
         index=True,
         comment="Статус промокода"
@@ -148,19 +174,19 @@ class Promocode(Base):
         "PromocodeUsage",
         back_populates="promocode",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     orders: Mapped[List["Order"]] = relationship(
         "Order",
         back_populates="promocode",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     creator: Mapped[Optional["User"]] = relationship(
         "User",
         foreign_keys=[created_by],
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     # Индексы
@@ -168,6 +194,18 @@ class Promocode(Base):
         Index("idx_promocode_code_active", "code", "is_active"),
         Index("idx_promocode_status", "status"),
         Index("idx_promocode_valid_dates", "valid_from", "valid_until"),
+        # Частичный индекс по коду только для промокодов, пригодных к
+        # погашению: выборка при применении промокода не трогает
+        # архивные/исчерпанные записи. Проверка дат остается в запросе —
+        # now() нельзя использовать в предикате индекса
+        Index(
+            "idx_promocode_redeemable",
+            "code",
+            postgresql_where=text(
+                "is_active AND status = 'active' "
+                "AND (max_uses IS NULL OR current_uses < max_uses)"
+            )
+        ),
     )
 
     def __repr__(self) -> str:
@@ -190,8 +228,22 @@ class Promocode(Base):
     @property
     def is_time_valid(self) -> bool:
         """Проверяет, действует ли промокод по времени"""
-        now = datetime.now()
+        # valid_from/valid_until хранятся с timezone — сравниваем с aware-временем
+        return self.is_time_valid_at(datetime.now(timezone.utc))
+
+    def is_time_valid_at(self, now: datetime) -> bool:
+        """
+        Проверяет действие промокода на заданный момент времени
+
+        Позволяет массовым проверкам (список промокодов в админке)
+        получить timestamp один раз и переиспользовать для всех строк.
 
+        Args:
+            now: Момент времени (timezone-aware)
+
+        Returns:
+            bool: Действует ли промокод
+        """
         if self.valid_from and now < self.valid_from:
             return False
 
@@ -222,19 +274,14 @@ class Promocode(Base):
         if not self.is_time_valid:
             return "Истек"
 
-        status_map = {
-            PromocodeStatus.ACTIVE: "Активен",
-            PromocodeStatus.INACTIVE: "Неактивен",
-            PromocodeStatus.EXPIRED: "Истек",
-            PromocodeStatus.EXHAUSTED: "Исчерпан"
-        }
-        return status_map.get(self.status, self.status.value)
+        return _STATUS_DISPLAY.get(self.status, self.status.value)
 
-    def can_be_used_by_user(self, user_id: int) -> bool:
+    async def can_be_used_by_user(self, session: AsyncSession, user_id: int) -> bool:
         """
         Проверяет, может ли пользователь использовать промокод
 
         Args:
+            session: Сессия базы данных
             user_id: ID пользователя
 
         Returns:
@@ -244,10 +291,15 @@ class Promocode(Base):
             return False
 
         if self.one_per_user:
-            # Проверяем, использовал ли уже этот пользователь промокод
-            for usage in self.usages:
-                if usage.user_id == user_id:
-                    return False
+            # Точечная проверка по уникальному индексу uq_promocode_user
+            # вместо загрузки всех использований в память
+            query = select(PromocodeUsage.id).where(
+                PromocodeUsage.promocode_id == self.id,
+                PromocodeUsage.user_id == user_id
+            ).limit(1)
+
+            if await session.scalar(query) is not None:
+                return False
 
         return True
 
@@ -282,18 +334,26 @@ class Promocode(Base):
         if not self.can_be_applied_to_order(order_amount):
             return Decimal('0.00')
 
-        discount_amount = order_amount * (Decimal(self.discount_percent) / 100)
+        # Считаем в целых копейках: цены хранятся с точностью Numeric(10, 2),
+        # целочисленное умножение/деление на порядки дешевле Decimal-операций
+        discount_kop = _to_kop(order_amount) * self.discount_percent // 100
 
         if self.max_discount_amount:
-            discount_amount = min(discount_amount, self.max_discount_amount)
+            discount_kop = min(discount_kop, _to_kop(self.max_discount_amount))
 
-        return discount_amount
+        return _from_kop(discount_kop)
 
-    def use(self, user_id: int, order_id: Optional[int] = None) -> "PromocodeUsage":
+    async def use(
+            self,
+            session: AsyncSession,
+            user_id: int,
+            order_id: Optional[int] = None
+    ) -> "PromocodeUsage":
         """
         Использует промокод
 
         Args:
+            session: Сессия базы данных
             user_id: ID пользователя
             order_id: ID заказа (опционально)
 
@@ -303,7 +363,7 @@ class Promocode(Base):
         Raises:
             ValueError: Если промокод нельзя использовать
         """
-        if not self.can_be_used_by_user(user_id):
+        if not await self.can_be_used_by_user(session, user_id):
             raise ValueError("Промокод нельзя использовать")
 
         # Увеличиваем счетчик использований
@@ -324,11 +384,23 @@ class Promocode(Base):
 
     def update_status(self) -> None:
         """Обновляет статус промокода на основе текущих условий"""
+        self.update_status_at(datetime.now(timezone.utc))
+
+    def update_status_at(self, now: datetime) -> None:
+        """
+        Обновляет статус промокода на заданный момент времени
+
+        Массовое обновление статусов берет timestamp один раз
+        и передает его сюда для каждого промокода.
+
+        Args:
+            now: Момент времени (timezone-aware)
+        """
         if not self.is_active:
             self.status = PromocodeStatus.INACTIVE
         elif self.is_exhausted:
             self.status = PromocodeStatus.EXHAUSTED
-        elif not self.is_time_valid:
+        elif not self.is_time_valid_at(now):
             self.status = PromocodeStatus.EXPIRED
         else:
             self.status = PromocodeStatus.ACTIVE
@@ -339,7 +411,7 @@ class PromocodeUsage(Base):
 
     __tablename__ = "promocode_usages"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # Связи
     promocode_id: Mapped[int] = mapped_column(
@@ -404,4 +476,49 @@ class PromocodeUsage(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<PromocodeUsage(id={self.id}, promocode_id={self.promocode_id}, user_id={self.user_id})>"
\ No newline at end of file
+        return f"<PromocodeUsage(id={self.id}, promocode_id={self.promocode_id}, user_id={self.user_id})>"
+
+
+async def refresh_all_statuses(session: AsyncSession) -> None:
+    """
+    Массово обновляет статусы всех промокодов одним UPDATE
+
+    Построчный вызов update_status() в фоновой задаче порождает
+    по одному UPDATE на промокод; здесь новый статус вычисляется
+    в CASE на стороне БД без материализации ORM-объектов.
+
+    Args:
+        session: Сессия БД
+    """
+    # В ветках CASE — строковые значения enum'а: голые члены
+    # PromocodeStatus уходят bind-параметрами без типа (NullType),
+    # которые asyncpg не может закодировать для VARCHAR-колонки
+    await session.execute(
+        update(Promocode).values(
+            status=case(
+                (Promocode.is_active == False, PromocodeStatus.INACTIVE.value),
+                (
+                    and_(
+                        Promocode.max_uses.isnot(None),
+                        Promocode.current_uses >= Promocode.max_uses
+                    ),
+                    PromocodeStatus.EXHAUSTED.value
+                ),
+                (
+                    or_(
+                        and_(
+                            Promocode.valid_until.isnot(None),
+                            Promocode.valid_until < func.now()
+                        ),
+                        and_(
+                            Promocode.valid_from.isnot(None),
+                            Promocode.valid_from > func.now()
+                        )
+                    ),
+                    PromocodeStatus.EXPIRED.value
+                ),
+                else_=PromocodeStatus.ACTIVE.value
+            )
+        )
+    )
+    await session.commit()
@@ -7,8 +7,9 @@ from datetime import datetime
 from typing import Optional, List
 from sqlalchemy import (
     BigInteger, String, Boolean, DateTime, Text,
-    Integer, func
+    Integer, func, select
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -19,7 +20,7 @@ class User(Base):
     __tablename__ = "users"
 
     # Основные поля
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     telegram_id: Mapped[int] = mapped_column(
         BigInteger,
         unique=True,
@@ -119,19 +120,19 @@ class User(Base):
     orders: Mapped[List["Order"]] = relationship(
         "Order",
         back_populates="user",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     cart_items: Mapped[List["CartItem"]] = relationship(
         "CartItem",
         back_populates="user",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     promocode_usages: Mapped[List["PromocodeUsage"]] = relationship(
         "PromocodeUsage",
         back_populates="user",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
 
     def __repr__(self) -> str:
@@ -154,15 +155,24 @@ class User(Base):
 
         return self.username or f"User {self.telegram_id}"
 
-    @property
-    def is_new_user(self) -> bool:
-        """Проверяет, является ли пользователь новым (без заказов)"""
-        return len(self.orders) == 0
+    async def has_no_orders(self, session: AsyncSession) -> bool:
+        """
+        Проверяет, является ли пользователь новым (без заказов)
 
-    @property
-    def total_orders(self) -> int:
+        Выполняется точечным EXISTS-запросом вместо загрузки всех
+        заказов пользователя ради сравнения с нулем. Имя не совпадает
+        с полем is_new_user схемы ответа — иначе from_attributes
+        попытается провалидировать сам метод.
+        """
+        from app.models.order import Order
+        query = select(Order.id).where(Order.user_id == self.id).limit(1)
+        return await session.scalar(query) is None
+
+    async def count_orders(self, session: AsyncSession) -> int:
         """Возвращает количество заказов пользователя"""
-        return len(self.orders)
+        from app.models.order import Order
+        query = select(func.count(Order.id)).where(Order.user_id == self.id)
+        return await session.scalar(query) or 0
 
     def has_contact_info(self) -> bool:
         """Проверяет, заполнена ли контактная информация"""
@@ -3,8 +3,19 @@
 """
 
 from datetime import datetime
-from typing import Optional, Any, Dict
-from pydantic import BaseModel, ConfigDict
+from decimal import Decimal
+from typing import Optional, Any, Dict, Annotated
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+
+# Общие строковые типы для горячих полей: Annotated-ограничения
+# сливаются в один Rust-валидатор pydantic-core и не тянут
+# дополнительную Field-метаданную на каждое поле
+PhoneStr = Annotated[str, StringConstraints(min_length=10, max_length=20)]
+NameStr = Annotated[str, StringConstraints(min_length=2, max_length=500)]
+
+# Денежный тип: явные max_digits/decimal_places включают быстрый
+# путь decimal-валидатора pydantic-core
+Money = Annotated[Decimal, Field(max_digits=12, decimal_places=2)]
 
 
 class BaseSchema(BaseModel):
@@ -28,7 +39,26 @@ class BaseUpdateSchema(BaseSchema):
     pass
 
 
-class BaseResponseSchema(BaseSchema):
+class FastResponseSchema(BaseSchema):
+    """
+    Базовая схема для высоконагруженных ответов
+
+    Отключает валидацию присваиваний и замораживает поля: объект
+    создается один раз по быстрому пути pydantic-core и дальше
+    не перевалидируется при каждой записи атрибута.
+    """
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        str_strip_whitespace=True,
+        validate_assignment=False,
+        frozen=True,
+        extra="ignore",
+        arbitrary_types_allowed=True
+    )
+
+
+class BaseResponseSchema(FastResponseSchema):
     """Базовая схема для ответов API"""
 
     id: int
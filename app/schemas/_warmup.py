@@ -0,0 +1,56 @@
+"""
+Прогрев Pydantic-схем при старте приложения
+
+Pydantic v2 лениво собирает core-схему при первой валидации, поэтому
+первый запрос в каждом воркере платит за компиляцию дерева валидаторов.
+Прогрев переносит эту стоимость на startup.
+"""
+
+import importlib
+
+from loguru import logger
+
+from app.schemas import BaseSchema
+
+# Модули со схемами: импортируем явно, чтобы все подклассы
+# BaseSchema были определены к моменту обхода
+_SCHEMA_MODULES = (
+    "app.schemas.admin",
+    "app.schemas.cart",
+    "app.schemas.order",
+    "app.schemas.payment",
+    "app.schemas.product",
+    "app.schemas.promocode",
+    "app.schemas.user",
+)
+
+
+def _iter_subclasses(cls: type) -> set:
+    """Рекурсивно собирает все подклассы схемы"""
+    subclasses = set()
+    for subclass in cls.__subclasses__():
+        subclasses.add(subclass)
+        subclasses.update(_iter_subclasses(subclass))
+    return subclasses
+
+
+def warmup_schemas() -> int:
+    """
+    Собирает core-схемы всех Pydantic-моделей заранее
+
+    Returns:
+        int: Количество прогретых схем
+    """
+    # Общее пространство имен всех схемных модулей: разрешает
+    # forward ref'ы, объявленные под TYPE_CHECKING
+    namespace = {}
+    for module_name in _SCHEMA_MODULES:
+        module = importlib.import_module(module_name)
+        namespace.update(vars(module))
+
+    schemas = _iter_subclasses(BaseSchema)
+    for schema_cls in schemas:
+        schema_cls.model_rebuild(force=True, _types_namespace=namespace)
+
+    logger.info(f"🔥 Прогрето Pydantic-схем: {len(schemas)}")
+    return len(schemas)
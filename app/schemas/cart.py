@@ -2,12 +2,28 @@
 Pydantic схемы для корзины
 """
 
+import re
 from decimal import Decimal
-from typing import List, Optional
-from pydantic import Field, field_validator
+from typing import List, Optional, Annotated, Literal, TYPE_CHECKING
+from pydantic import Field, field_validator, StringConstraints
 
-from app.schemas import BaseSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema
-from app.schemas.product import ProductCatalogSchema
+from app.schemas import (
+    BaseSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema,
+    FastResponseSchema, PhoneStr, NameStr, Money
+)
+
+if TYPE_CHECKING:
+    # Отложенный импорт: импорт корзины не тянет построение
+    # core-схем всего продуктового модуля; forward ref
+    # разрешается при прогреве схем на старте
+    from app.schemas.product import ProductCatalogSchema
+
+CityStr = Annotated[str, StringConstraints(min_length=2, max_length=200)]
+
+# Скомпилированы один раз на модуль: checkout — горячий путь,
+# компиляция regex и цепочка str.replace на каждый запрос не нужны
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_STRIP = str.maketrans({c: None for c in "+-() "})
 
 
 class CartItemCreateSchema(BaseCreateSchema):
@@ -16,50 +32,40 @@ class CartItemCreateSchema(BaseCreateSchema):
     product_id: int = Field(..., gt=0, description="ID товара")
     quantity: int = Field(1, ge=1, le=99, description="Количество")
 
-    @field_validator("quantity")
-    @classmethod
-    def validate_quantity(cls, v):
-        if v < 1:
-            raise ValueError("Количество должно быть больше 0")
-        if v > 99:
-            raise ValueError("Максимальное количество: 99")
-        return v
-
 
 class CartItemUpdateSchema(BaseUpdateSchema):
     """Схема для обновления товара в корзине"""
 
     quantity: int = Field(..., ge=1, le=99, description="Новое количество")
 
-    @field_validator("quantity")
-    @classmethod
-    def validate_quantity(cls, v):
-        if v < 1:
-            raise ValueError("Количество должно быть больше 0")
-        if v > 99:
-            raise ValueError("Максимальное количество: 99")
-        return v
-
 
 class CartItemResponseSchema(BaseResponseSchema):
     """Схема для элемента корзины"""
 
     product_id: int
     quantity: int
-    price_at_add: Decimal
+    price_at_add: Money
 
     # Связанный товар
-    product: ProductCatalogSchema
+    product: "ProductCatalogSchema"
 
     # Вычисляемые поля
-    total_price: Decimal
-    current_total_price: Decimal
+    total_price: Money
+    current_total_price: Money
     price_changed: bool
     is_available: bool
     max_available_quantity: int
 
 
-class CartResponseSchema(BaseSchema):
+class CartIssueSchema(BaseSchema):
+    """Проблема с позицией корзины (нет в наличии, изменилась цена и т.п.)"""
+
+    code: str = Field(..., description="Код проблемы")
+    message: str = Field(..., description="Описание проблемы")
+    product_id: Optional[int] = Field(None, description="ID товара, если применимо")
+
+
+class CartResponseSchema(FastResponseSchema):
     """Схема для корзины"""
 
     items: List[CartItemResponseSchema] = []
@@ -67,17 +73,17 @@ class CartResponseSchema(BaseSchema):
     # Итоговые суммы
     total_items: int
     total_quantity: int
-    subtotal: Decimal
-    delivery_cost: Decimal
-    total: Decimal
+    subtotal: Money
+    delivery_cost: Money
+    total: Money
 
     # Информация о доставке
-    free_delivery_threshold: Decimal
+    free_delivery_threshold: Money
     is_free_delivery: bool
 
     # Валидация корзины
     is_valid: bool
-    issues: List[dict] = []
+    issues: List[CartIssueSchema] = []
 
 
 class CartSummarySchema(BaseSchema):
@@ -85,7 +91,7 @@ class CartSummarySchema(BaseSchema):
 
     total_items: int
     total_quantity: int
-    total: Decimal
+    total: Money
     is_valid: bool
 
 
@@ -93,7 +99,7 @@ class CartValidationSchema(BaseSchema):
     """Схема для результата валидации корзины"""
 
     is_valid: bool
-    issues: List[dict] = []
+    issues: List[CartIssueSchema] = []
     valid_items: List[CartItemResponseSchema] = []
     total_issues: int
 
@@ -101,12 +107,12 @@ class CartValidationSchema(BaseSchema):
 class CartTotalsSchema(BaseSchema):
     """Схема для подсчета итогов корзины"""
 
-    subtotal: Decimal = Field(..., description="Стоимость товаров")
-    delivery_cost: Decimal = Field(..., description="Стоимость доставки")
-    discount_amount: Decimal = Field(Decimal('0.00'), description="Размер скидки")
-    total: Decimal = Field(..., description="Итоговая сумма")
+    subtotal: Money = Field(..., description="Стоимость товаров")
+    delivery_cost: Money = Field(..., description="Стоимость доставки")
+    discount_amount: Money = Field(Decimal('0.00'), description="Размер скидки")
+    total: Money = Field(..., description="Итоговая сумма")
 
-    free_delivery_threshold: Decimal
+    free_delivery_threshold: Money
     is_free_delivery: bool
 
     # Детали
@@ -127,7 +133,7 @@ class PromocodeApplicationResultSchema(BaseSchema):
     message: str
     promocode_code: Optional[str] = None
     discount_percent: Optional[int] = None
-    discount_amount: Optional[Decimal] = None
+    discount_amount: Optional[Money] = None
 
     # Новые итоги после применения
     new_totals: Optional[CartTotalsSchema] = None
@@ -137,12 +143,12 @@ class CartCheckoutSchema(BaseSchema):
     """Схема для данных при оформлении заказа"""
 
     # Контактная информация
-    customer_name: str = Field(..., min_length=2, max_length=500, description="ФИО")
-    customer_phone: str = Field(..., min_length=10, max_length=20, description="Телефон")
+    customer_name: NameStr = Field(..., description="ФИО")
+    customer_phone: PhoneStr = Field(..., description="Телефон")
     customer_email: Optional[str] = Field(None, max_length=255, description="Email")
 
     # Доставка
-    delivery_city: str = Field(..., min_length=2, max_length=200, description="Город")
+    delivery_city: CityStr = Field(..., description="Город")
     delivery_address: str = Field(..., min_length=5, description="Адрес ПВЗ")
     delivery_city_code: Optional[str] = Field(None, max_length=20, description="Код города СДЭК")
     delivery_point_code: Optional[str] = Field(None, max_length=20, description="Код ПВЗ")
@@ -157,7 +163,7 @@ class CartCheckoutSchema(BaseSchema):
     @classmethod
     def validate_phone(cls, v):
         # Простая валидация телефона
-        clean_phone = v.replace("+", "").replace("-", "").replace(" ", "").replace("(", "").replace(")", "")
+        clean_phone = v.translate(_PHONE_STRIP)
         if not clean_phone.isdigit() or len(clean_phone) < 10:
             raise ValueError("Некорректный формат телефона")
         return v
@@ -165,40 +171,29 @@ class CartCheckoutSchema(BaseSchema):
     @field_validator("customer_email")
     @classmethod
     def validate_email(cls, v):
-        if v:
-            import re
-            pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(pattern, v):
-                raise ValueError("Некорректный формат email")
+        if v and not _EMAIL_RE.match(v):
+            raise ValueError("Некорректный формат email")
         return v
 
 
 class CartClearSchema(BaseSchema):
     """Схема для очистки корзины"""
 
-    confirm: bool = Field(..., description="Подтверждение очистки")
+    # Literal[True]: проверку подтверждения делает литеральный
+    # валидатор pydantic-core, Python-коллбэк не нужен
+    confirm: Literal[True] = Field(..., description="Подтверждение очистки")
 
-    @field_validator("confirm")
-    @classmethod
-    def validate_confirm(cls, v):
-        if not v:
-            raise ValueError("Требуется подтверждение очистки корзины")
-        return v
+
+class CartBulkItem(BaseSchema):
+    """Элемент массового обновления корзины"""
+
+    product_id: int = Field(..., gt=0, description="ID товара")
+    quantity: int = Field(..., ge=1, le=99, description="Количество")
 
 
 class CartBulkUpdateSchema(BaseSchema):
     """Схема для массового обновления корзины"""
 
-    items: List[dict] = Field(..., min_length=1, description="Список обновлений")
-
-    @field_validator("items")
-    @classmethod
-    def validate_items(cls, v):
-        for item in v:
-            if "product_id" not in item or "quantity" not in item:
-                raise ValueError("Каждый элемент должен содержать product_id и quantity")
-            if not isinstance(item["product_id"], int) or item["product_id"] <= 0:
-                raise ValueError("product_id должен быть положительным числом")
-            if not isinstance(item["quantity"], int) or item["quantity"] < 1:
-                raise ValueError("quantity должен быть больше 0")
-        return v
\ No newline at end of file
+    # Типизированная вложенная модель: pydantic-core валидирует весь
+    # список в Rust вместо Python-цикла с isinstance по каждой строке
+    items: List[CartBulkItem] = Field(..., min_length=1, description="Список обновлений")
\ No newline at end of file
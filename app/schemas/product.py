@@ -4,17 +4,51 @@ Pydantic схемы для товаров
 
 from decimal import Decimal
 from typing import Optional, List, Annotated
-from pydantic import field_validator, Field, computed_field, model_validator
+from pydantic import Field, model_validator, StringConstraints, TypeAdapter
 
-from app.schemas import BaseSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema
+from app.schemas import (
+    BaseSchema, BaseCreateSchema, BaseUpdateSchema,
+    BaseResponseSchema, FastResponseSchema, Money
+)
+
+# Порог "товар заканчивается" для производных полей схем;
+# должен совпадать с MarketplaceSettings.LOW_STOCK_THRESHOLD
+LOW_STOCK_THRESHOLD = 30
+
+ProductNameStr = Annotated[str, StringConstraints(min_length=1, max_length=500)]
+
+# Денежные/весовые типы: границы и число знаков проверяет
+# decimal-валидатор pydantic-core без Python-коллбэка и quantize
+Price = Annotated[Decimal, Field(gt=0, max_digits=12, decimal_places=2)]
+Weight = Annotated[Decimal, Field(ge=0, max_digits=10, decimal_places=3)]
+
+
+def _catalog_display_fields(price: Decimal, is_available: bool, quantity: int) -> dict:
+    """Считает производные поля карточки каталога за один проход"""
+    in_stock = quantity > 0
+    if not is_available:
+        stock_status = "Недоступен"
+    elif not in_stock:
+        stock_status = "Нет в наличии"
+    elif quantity < LOW_STOCK_THRESHOLD:
+        stock_status = f"Заканчивается ({quantity} шт.)"
+    else:
+        stock_status = f"В наличии ({quantity} шт.)"
+
+    return {
+        "display_price": f"{price:,.2f} ₽".replace(",", " "),
+        "stock_status": stock_status,
+        "is_in_stock": in_stock,
+        "is_purchasable": is_available and in_stock
+    }
 
 
 class ProductCreateSchema(BaseCreateSchema):
     """Схема для создания товара"""
 
-    name: str = Field(..., min_length=1, max_length=500, description="Название товара")
+    name: ProductNameStr = Field(..., description="Название товара")
     description: Optional[str] = Field(None, max_length=5000, description="Описание товара")
-    price: Decimal = Field(..., gt=0, description="Цена в рублях")
+    price: Price = Field(..., description="Цена в рублях")
     image_url: Optional[str] = Field(None, max_length=1000, description="URL изображения")
     detail_url: Optional[str] = Field(None, max_length=1000, description="Ссылка на подробности")
 
@@ -27,7 +61,7 @@ class ProductCreateSchema(BaseCreateSchema):
     tags: Optional[str] = Field(None, description="Теги через запятую")
 
     # Характеристики
-    weight: Optional[Decimal] = Field(None, ge=0, description="Вес в граммах")
+    weight: Optional[Weight] = Field(None, description="Вес в граммах")
     dimensions: Optional[str] = Field(None, max_length=100, description="Размеры ДxШxВ см")
 
     # Лимиты заказа
@@ -36,24 +70,6 @@ class ProductCreateSchema(BaseCreateSchema):
 
     notes: Optional[str] = Field(None, description="Внутренние заметки")
 
-    @field_validator("price")
-    @classmethod
-    def validate_price(cls, v):
-        if v <= 0:
-            raise ValueError("Цена должна быть больше 0")
-        # Ограничиваем до 2 знаков после запятой
-        return v.quantize(Decimal('0.01'))
-
-    @field_validator("weight")
-    @classmethod
-    def validate_weight(cls, v):
-        if v is not None:
-            if v < 0:
-                raise ValueError("Вес не может быть отрицательным")
-            # Ограничиваем до 3 знаков после запятой
-            return v.quantize(Decimal('0.001'))
-        return v
-
     @model_validator(mode='after')
     def validate_order_quantities(self):
         if self.max_order_quantity is not None and self.max_order_quantity < self.min_order_quantity:
@@ -66,7 +82,7 @@ class ProductUpdateSchema(BaseUpdateSchema):
 
     name: Optional[str] = Field(None, min_length=1, max_length=500)
     description: Optional[str] = Field(None, max_length=5000)
-    price: Optional[Decimal] = Field(None, gt=0, description="Цена в рублях")
+    price: Optional[Price] = Field(None, description="Цена в рублях")
     image_url: Optional[str] = Field(None, max_length=1000)
     detail_url: Optional[str] = Field(None, max_length=1000)
 
@@ -78,7 +94,7 @@ class ProductUpdateSchema(BaseUpdateSchema):
     sort_order: Optional[int] = None
     tags: Optional[str] = None
 
-    weight: Optional[Decimal] = Field(None, ge=0, description="Вес в граммах")
+    weight: Optional[Weight] = Field(None, description="Вес в граммах")
     dimensions: Optional[str] = Field(None, max_length=100)
 
     min_order_quantity: Optional[int] = Field(None, ge=1)
@@ -86,31 +102,13 @@ class ProductUpdateSchema(BaseUpdateSchema):
 
     notes: Optional[str] = None
 
-    @field_validator("price")
-    @classmethod
-    def validate_price(cls, v):
-        if v is not None:
-            if v <= 0:
-                raise ValueError("Цена должна быть больше 0")
-            return v.quantize(Decimal('0.01'))
-        return v
-
-    @field_validator("weight")
-    @classmethod
-    def validate_weight(cls, v):
-        if v is not None:
-            if v < 0:
-                raise ValueError("Вес не может быть отрицательным")
-            return v.quantize(Decimal('0.001'))
-        return v
-
 
 class ProductResponseSchema(BaseResponseSchema):
     """Схема для ответа с данными товара"""
 
     name: str
     description: Optional[str] = None
-    price: Decimal
+    price: Money
     image_url: Optional[str] = None
     detail_url: Optional[str] = None
 
@@ -131,50 +129,45 @@ class ProductResponseSchema(BaseResponseSchema):
     views_count: int
     orders_count: int
 
-    @computed_field
-    @property
-    def display_price(self) -> str:
-        """Цена в читаемом формате"""
-        return f"{self.price:,.2f} ₽".replace(",", " ")
+    # Производные поля: вычисляются один раз при построении модели,
+    # сериализация отдает их как обычные поля без вызова property
+    display_price: str = ""
+    stock_status: str = ""
+    is_in_stock: bool = False
+    is_low_stock: bool = False
+    is_purchasable: bool = False
 
-    @computed_field
-    @property
-    def stock_status(self) -> str:
-        """Статус наличия товара"""
+    @model_validator(mode='after')
+    def _derive_display_fields(self):
+        quantity = self.stock_quantity
+        in_stock = quantity > 0
         if not self.is_available:
-            return "Недоступен"
-        if self.stock_quantity <= 0:
-            return "Нет в наличии"
-        if self.stock_quantity < 30:  # LOW_STOCK_THRESHOLD
-            return f"Заканчивается ({self.stock_quantity} шт.)"
-        return f"В наличии ({self.stock_quantity} шт.)"
-
-    @computed_field
-    @property
-    def is_in_stock(self) -> bool:
-        """Есть ли товар в наличии"""
-        return self.stock_quantity > 0
-
-    @computed_field
-    @property
-    def is_low_stock(self) -> bool:
-        """Заканчивается ли товар"""
-        return self.stock_quantity < 30  # LOW_STOCK_THRESHOLD
-
-    @computed_field
-    @property
-    def is_purchasable(self) -> bool:
-        """Можно ли купить товар"""
-        return self.is_available and not self.is_hidden and self.is_in_stock
-
-
-class ProductCatalogSchema(BaseSchema):
+            stock_status = "Недоступен"
+        elif not in_stock:
+            stock_status = "Нет в наличии"
+        elif quantity < LOW_STOCK_THRESHOLD:
+            stock_status = f"Заканчивается ({quantity} шт.)"
+        else:
+            stock_status = f"В наличии ({quantity} шт.)"
+
+        # Через __dict__, чтобы не въехать в validate_assignment
+        self.__dict__.update(
+            display_price=f"{self.price:,.2f} ₽".replace(",", " "),
+            stock_status=stock_status,
+            is_in_stock=in_stock,
+            is_low_stock=quantity < LOW_STOCK_THRESHOLD,
+            is_purchasable=self.is_available and not self.is_hidden and in_stock
+        )
+        return self
+
+
+class ProductCatalogSchema(FastResponseSchema):
     """Схема для отображения товара в каталоге"""
 
     id: int
     name: str
     description: Optional[str] = None
-    price: Decimal
+    price: Money
     image_url: Optional[str] = None
 
     is_available: bool
@@ -184,35 +177,49 @@ class ProductCatalogSchema(BaseSchema):
     min_order_quantity: int
     max_order_quantity: Optional[int] = None
 
-    @computed_field
-    @property
-    def display_price(self) -> str:
-        """Цена в читаемом формате"""
-        return f"{self.price:,.2f} ₽".replace(",", " ")
-
-    @computed_field
-    @property
-    def is_in_stock(self) -> bool:
-        """Есть ли товар в наличии"""
-        return self.stock_quantity > 0
-
-    @computed_field
-    @property
-    def stock_status(self) -> str:
-        """Статус наличия товара"""
-        if not self.is_available:
-            return "Недоступен"
-        if self.stock_quantity <= 0:
-            return "Нет в наличии"
-        if self.stock_quantity < 30:
-            return f"Заканчивается ({self.stock_quantity} шт.)"
-        return f"В наличии ({self.stock_quantity} шт.)"
+    # Производные поля считаются один раз при построении модели
+    display_price: str = ""
+    stock_status: str = ""
+    is_in_stock: bool = False
+    is_purchasable: bool = False
 
-    @computed_field
-    @property
-    def is_purchasable(self) -> bool:
-        """Можно ли купить товар"""
-        return self.is_available and self.is_in_stock
+    @model_validator(mode='after')
+    def _derive_display_fields(self):
+        self.__dict__.update(_catalog_display_fields(
+            self.price, self.is_available, self.stock_quantity
+        ))
+        return self
+
+    @classmethod
+    def from_row(cls, product) -> "ProductCatalogSchema":
+        """
+        Быстрое преобразование доверенной ORM-строки без валидации
+
+        БД — источник истины для этих полей, поэтому в листингах
+        полная валидация pydantic-core не нужна: model_construct
+        пропускает диспетчеризацию валидаторов по каждому полю,
+        производные поля заполняются здесь же.
+        """
+        return cls.model_construct(
+            id=product.id,
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            image_url=product.image_url,
+            is_available=product.is_available,
+            stock_quantity=product.stock_quantity,
+            category=product.category,
+            min_order_quantity=product.min_order_quantity,
+            max_order_quantity=product.max_order_quantity,
+            **_catalog_display_fields(
+                product.price, product.is_available, product.stock_quantity
+            )
+        )
+
+
+# Один скомпилированный list-of-model валидатор/сериализатор на модуль:
+# страница каталога (до 100 позиций) дампится одним проходом в Rust
+PRODUCT_CATALOG_LIST = TypeAdapter(List[ProductCatalogSchema])
 
 
 class ProductAdminSchema(ProductResponseSchema):
@@ -268,6 +275,6 @@ class ProductStatsSchema(BaseSchema):
     views_count: int
     orders_count: int
     total_ordered_quantity: int
-    revenue: Decimal
+    revenue: Money
     current_stock: int
     is_low_stock: bool
\ No newline at end of file
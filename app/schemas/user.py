@@ -4,9 +4,15 @@ Pydantic схемы для пользователей
 
 from datetime import datetime
 from typing import Optional
-from pydantic import field_validator, Field
+from pydantic import field_validator, Field, computed_field
 
-from app.schemas import BaseSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema
+from app.schemas import (
+    BaseSchema, BaseCreateSchema, BaseUpdateSchema, BaseResponseSchema,
+    PhoneStr, NameStr
+)
+
+# Таблица трансляции вместо цепочки str.replace на каждую валидацию
+_PHONE_STRIP = str.maketrans({c: None for c in "+-() "})
 
 
 class UserCreateSchema(BaseCreateSchema):
@@ -40,7 +46,7 @@ class UserUpdateSchema(BaseUpdateSchema):
     @field_validator("phone")
     @classmethod
     def validate_phone(cls, v):
-        if v and not v.replace("+", "").replace("-", "").replace(" ", "").replace("(", "").replace(")", "").isdigit():
+        if v and not v.translate(_PHONE_STRIP).isdigit():
             raise ValueError("Некорректный формат телефона")
         return v
 
@@ -63,10 +69,20 @@ class UserResponseSchema(BaseResponseSchema):
     last_activity: Optional[datetime] = None
 
     # Вычисляемые поля
-    display_name: str = ""
     is_new_user: bool = False
     total_orders: int = 0
 
+    @computed_field
+    @property
+    def display_name(self) -> str:
+        """Отображаемое имя: ФИО, имя из Telegram, username или ID"""
+        return (
+            self.full_name
+            or " ".join(p for p in (self.first_name, self.last_name) if p)
+            or self.username
+            or f"User {self.telegram_id}"
+        )
+
 
 class UserProfileSchema(BaseSchema):
     """Схема для профиля пользователя (краткая)"""
@@ -90,14 +106,14 @@ class UserAdminResponseSchema(UserResponseSchema):
 class UserContactInfoSchema(BaseSchema):
     """Схема для контактной информации"""
 
-    full_name: str = Field(..., min_length=2, max_length=500, description="ФИО")
-    phone: str = Field(..., min_length=10, max_length=20, description="Телефон")
+    full_name: NameStr = Field(..., description="ФИО")
+    phone: PhoneStr = Field(..., description="Телефон")
 
     @field_validator("phone")
     @classmethod
     def validate_phone(cls, v):
         # Простая валидация номера телефона
-        clean_phone = v.replace("+", "").replace("-", "").replace(" ", "").replace("(", "").replace(")", "")
+        clean_phone = v.translate(_PHONE_STRIP)
         if not clean_phone.isdigit() or len(clean_phone) < 10:
             raise ValueError("Некорректный формат телефона")
         return v
@@ -0,0 +1,150 @@
+"""
+Сервис массового импорта через PostgreSQL COPY
+
+Построчный session.add() при загрузке каталога или генерации партии
+промокодов выполняет по одному INSERT на запись — с разбором запроса,
+биндингом параметров и WAL-оверхедом на каждую. COPY FROM STDIN через
+asyncpg стримит все записи одним протокольным сообщением.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.models.promocode import PromocodeStatus
+
+# Колонки указываются явно: для остальных сработают server_default'ы,
+# а колонки с default'ами уровня ORM (они не видны COPY) заполняем сами
+_PRODUCT_COLUMNS = (
+    "name", "description", "price", "image_url", "detail_url",
+    "stock_quantity", "is_available", "is_hidden",
+    "category", "sort_order", "tags",
+    "min_order_quantity", "max_order_quantity",
+    "views_count", "orders_count"
+)
+
+_PROMOCODE_COLUMNS = (
+    "code", "name", "discount_percent",
+    "min_order_amount", "max_discount_amount",
+    "max_uses", "current_uses", "one_per_user",
+    "valid_from", "valid_until",
+    "status", "is_active"
+)
+
+
+class BulkImportService:
+    """Массовая загрузка товаров и промокодов"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def import_products(self, rows: List[dict]) -> int:
+        """
+        Импортирует товары одним COPY вместо N INSERT'ов
+
+        Args:
+            rows: Список словарей с полями товара (name и price обязательны)
+
+        Returns:
+            int: Количество загруженных товаров (0 при ошибке)
+        """
+        if not rows:
+            return 0
+
+        try:
+            records = [
+                (
+                    row["name"],
+                    row.get("description"),
+                    Decimal(str(row["price"])),
+                    row.get("image_url"),
+                    row.get("detail_url"),
+                    int(row.get("stock_quantity", 0)),
+                    bool(row.get("is_available", True)),
+                    bool(row.get("is_hidden", False)),
+                    row.get("category"),
+                    int(row.get("sort_order", 0)),
+                    row.get("tags"),
+                    int(row.get("min_order_quantity", 1)),
+                    row.get("max_order_quantity"),
+                    0,  # views_count
+                    0   # orders_count
+                )
+                for row in rows
+            ]
+
+            await self._copy_records("products", _PRODUCT_COLUMNS, records)
+
+            logger.success(f"📦 Импортировано товаров через COPY: {len(records)}")
+            return len(records)
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"❌ Ошибка массового импорта товаров: {e}")
+            return 0
+
+    async def import_promocodes(
+        self,
+        rows: List[dict],
+        valid_until: Optional[datetime] = None
+    ) -> int:
+        """
+        Импортирует партию промокодов одним COPY
+
+        Args:
+            rows: Список словарей с полями промокода
+                  (code и discount_percent обязательны)
+            valid_until: Общий срок действия партии (если не задан в строке)
+
+        Returns:
+            int: Количество загруженных промокодов (0 при ошибке)
+        """
+        if not rows:
+            return 0
+
+        try:
+            records = [
+                (
+                    row["code"],
+                    row.get("name"),
+                    int(row["discount_percent"]),
+                    row.get("min_order_amount"),
+                    row.get("max_discount_amount"),
+                    row.get("max_uses"),
+                    0,  # current_uses
+                    bool(row.get("one_per_user", True)),
+                    row.get("valid_from"),
+                    row.get("valid_until", valid_until),
+                    PromocodeStatus.ACTIVE.value,
+                    True  # is_active
+                )
+                for row in rows
+            ]
+
+            await self._copy_records("promocodes", _PROMOCODE_COLUMNS, records)
+
+            logger.success(f"🎟️ Импортировано промокодов через COPY: {len(records)}")
+            return len(records)
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"❌ Ошибка массового импорта промокодов: {e}")
+            return 0
+
+    async def _copy_records(self, table: str, columns: tuple, records: list) -> None:
+        """Стримит записи в таблицу через asyncpg copy_records_to_table"""
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+
+        # asyncpg-соединение под адаптером SQLAlchemy: COPY идет мимо
+        # ORM и разбора SQL, одним потоком в рамках текущей транзакции
+        await raw.driver_connection.copy_records_to_table(
+            table,
+            records=records,
+            columns=list(columns)
+        )
+
+        await self.session.commit()
@@ -0,0 +1,148 @@
+"""
+Redis-кэш для горячих чтений каталога
+
+Каталог, категории и рекомендуемые товары меняются редко, но
+запрашиваются на каждый экран — чтение из Redis заменяет пару
+SELECT + COUNT одним GET. Инвалидация каталожных ключей идет через
+счетчик версии (часть ключа), поэтому не требует SCAN по ключам.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+from loguru import logger
+
+from app.core.config import redis_settings
+
+# TTL по типам данных
+CATALOG_TTL_SECONDS = 60
+CATEGORIES_TTL_SECONDS = 600
+LOW_STOCK_TTL_SECONDS = 60
+
+_CATEGORIES_KEY = "products:categories"
+_CATALOG_VERSION_KEY = "catalog:ver"
+_LOW_STOCK_VERSION_KEY = "low_stock:ver"
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """Возвращает общий Redis-клиент (ленивая инициализация пула)"""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(
+            redis_settings.REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    """Закрывает Redis-соединения при остановке приложения"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def catalog_cache_key(filters_dump: dict, include_hidden: bool) -> Optional[str]:
+    """
+    Строит версионированный ключ кэша страницы каталога
+
+    Версия каталога входит в ключ: инвалидация — это INCR одного
+    счетчика, старые ключи умирают по TTL без SCAN.
+    """
+    try:
+        redis = get_redis()
+        version = await redis.get(_CATALOG_VERSION_KEY) or "0"
+        payload = json.dumps(
+            {"f": filters_dump, "h": include_hidden},
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        return f"catalog:{version}:{digest}"
+    except Exception as e:
+        logger.warning(f"⚠️ Redis недоступен для ключа каталога: {e}")
+        return None
+
+
+async def cache_get_json(key: str) -> Optional[Any]:
+    """Читает и декодирует закэшированное значение (None при промахе)"""
+    try:
+        raw = await get_redis().get(key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка чтения кэша {key}: {e}")
+        return None
+
+
+async def cache_set_json(key: str, value: Any, ttl_seconds: int) -> None:
+    """Кладет значение в кэш с TTL; ошибки Redis не роняют запрос"""
+    try:
+        await get_redis().setex(key, ttl_seconds, json.dumps(value, default=str))
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка записи кэша {key}: {e}")
+
+
+async def cache_get_text(key: str) -> Optional[str]:
+    """Читает готовое сериализованное тело ответа из кэша"""
+    try:
+        return await get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка чтения кэша {key}: {e}")
+        return None
+
+
+async def cache_set_text(key: str, value: str, ttl_seconds: int) -> None:
+    """Кладет готовое тело ответа в кэш с TTL"""
+    try:
+        await get_redis().setex(key, ttl_seconds, value)
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка записи кэша {key}: {e}")
+
+
+async def invalidate_catalog_cache() -> None:
+    """
+    Инвалидирует кэш каталога и категорий после мутаций товаров
+
+    Вызывается из create/update/delete товара и смены изображения.
+    """
+    try:
+        redis = get_redis()
+        await redis.incr(_CATALOG_VERSION_KEY)
+        await redis.delete(_CATEGORIES_KEY)
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка инвалидации кэша каталога: {e}")
+
+
+def categories_cache_key() -> str:
+    """Ключ кэша списка категорий"""
+    return _CATEGORIES_KEY
+
+
+async def low_stock_cache_key(threshold: int) -> Optional[str]:
+    """
+    Строит версионированный ключ кэша низких остатков
+
+    Инвалидация — INCR счетчика версии, как у каталога.
+    """
+    try:
+        version = await get_redis().get(_LOW_STOCK_VERSION_KEY) or "0"
+        return f"low_stock:{version}:{threshold}"
+    except Exception as e:
+        logger.warning(f"⚠️ Redis недоступен для ключа низких остатков: {e}")
+        return None
+
+
+async def invalidate_low_stock_cache() -> None:
+    """Инвалидирует кэш низких остатков после изменения остатков"""
+    try:
+        await get_redis().incr(_LOW_STOCK_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка инвалидации кэша низких остатков: {e}")
@@ -0,0 +1,90 @@
+"""
+Дебаунс уведомлений о низком остатке
+События копятся несколько секунд и уходят админам одним сообщением
+вместо очереди отдельных сообщений на каждый товар
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+# Задержка перед отправкой: события за это окно склеиваются
+FLUSH_DELAY_SECONDS = 3.0
+
+# Повторное уведомление по тому же товару — не чаще раза в 10 минут,
+# иначе всплеск заказов по ходовому товару заспамит админов
+RESEND_COOLDOWN_SECONDS = 600.0
+
+# Накопленные события: product_id -> (название, остаток, цена)
+_pending: Dict[int, Tuple[str, int, str]] = {}
+
+# Когда по товару последний раз уходило уведомление
+_last_sent: Dict[int, float] = {}
+
+_flush_task: Optional[asyncio.Task] = None
+
+
+def enqueue(product_id: int, name: str, stock_quantity: int, display_price: str) -> None:
+    """
+    Ставит событие низкого остатка в очередь на отправку
+
+    Повторное событие по тому же товару перезаписывает предыдущее,
+    отправка не блокирует путь коммита заказа.
+
+    Args:
+        product_id: ID товара
+        name: Название товара
+        stock_quantity: Текущий остаток
+        display_price: Отформатированная цена
+    """
+    global _flush_task
+
+    last_sent = _last_sent.get(product_id)
+    if last_sent is not None and time.monotonic() - last_sent < RESEND_COOLDOWN_SECONDS:
+        return
+
+    _pending[product_id] = (name, stock_quantity, display_price)
+
+    if _flush_task is None or _flush_task.done():
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне event loop (скрипты) — уведомление уйдет при следующем событии
+            return
+        _flush_task = loop.create_task(_flush_after_delay())
+
+
+async def _flush_after_delay() -> None:
+    """Отправляет накопленные события одним сообщением"""
+    await asyncio.sleep(FLUSH_DELAY_SECONDS)
+
+    events = dict(_pending)
+    _pending.clear()
+
+    if not events:
+        return
+
+    now = time.monotonic()
+    for product_id in events:
+        _last_sent[product_id] = now
+
+    try:
+        lines = [
+            f"📦 *{name}*: {quantity} шт. ({price})"
+            for name, quantity, price in events.values()
+        ]
+        message = (
+            f"⚠️ *Низкий остаток товаров*\n\n"
+            + "\n".join(lines)
+            + "\n\nРекомендуется пополнить остатки."
+        )
+
+        from app.services.telegram.message_service import message_service
+        await message_service.send_admin_notification(message)
+
+        logger.warning(f"⚠️ Отправлено уведомление о низком остатке: {len(events)} товаров")
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка отправки уведомления о низком остатке: {e}")
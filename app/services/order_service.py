@@ -0,0 +1,98 @@
+"""
+Сервис заказов
+Горячий поиск заказа по номеру с кешированием
+"""
+
+import time
+from typing import Optional
+
+from sqlalchemy import select, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.models.order import Order
+
+# Кеш "номер заказа -> (id, время истечения)".
+# Храним только первичный ключ: повторная выборка по PK — дешевый
+# индексный запрос, а сами ORM-объекты не переживают границы сессий.
+_ORDER_ID_CACHE: dict = {}
+_CACHE_TTL_SECONDS = 30.0
+_CACHE_MAX_SIZE = 10_000
+
+
+def _cache_get(order_number: str) -> Optional[int]:
+    """Возвращает закешированный ID заказа или None"""
+    entry = _ORDER_ID_CACHE.get(order_number)
+    if entry is None:
+        return None
+
+    order_id, expires_at = entry
+    if time.monotonic() > expires_at:
+        _ORDER_ID_CACHE.pop(order_number, None)
+        return None
+
+    return order_id
+
+
+def _cache_put(order_number: str, order_id: int) -> None:
+    """Сохраняет ID заказа в кеш с TTL"""
+    if len(_ORDER_ID_CACHE) >= _CACHE_MAX_SIZE:
+        # Простая защита от разрастания: сбрасываем кеш целиком
+        _ORDER_ID_CACHE.clear()
+
+    _ORDER_ID_CACHE[order_number] = (order_id, time.monotonic() + _CACHE_TTL_SECONDS)
+
+
+def invalidate_order_cache(order_number: str) -> None:
+    """
+    Инвалидация кеша для конкретного номера заказа
+
+    Args:
+        order_number: Номер заказа
+    """
+    _ORDER_ID_CACHE.pop(order_number, None)
+
+
+@event.listens_for(Order, "after_update")
+def _invalidate_cache_on_update(mapper, connection, target: Order) -> None:
+    """Сбрасывает кеш при любом обновлении заказа"""
+    if target.order_number:
+        invalidate_order_cache(target.order_number)
+
+
+async def get_order_by_number(session: AsyncSession, order_number: str) -> Optional[Order]:
+    """
+    Получение заказа по номеру с кешированием ID
+
+    Горячий путь для страниц статуса оплаты: один и тот же заказ
+    запрашивается много раз подряд. При попадании в кеш выборка
+    выполняется по первичному ключу вместо поиска по номеру.
+
+    Args:
+        session: Сессия базы данных
+        order_number: Номер заказа
+
+    Returns:
+        Order или None
+    """
+    try:
+        cached_id = _cache_get(order_number)
+        if cached_id is not None:
+            order = await session.get(Order, cached_id)
+            if order is not None:
+                return order
+            # Заказ удален — чистим устаревшую запись
+            invalidate_order_cache(order_number)
+
+        query = select(Order).where(Order.order_number == order_number)
+        result = await session.execute(query)
+        order = result.scalar_one_or_none()
+
+        if order is not None:
+            _cache_put(order_number, order.id)
+
+        return order
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка получения заказа {order_number}: {e}")
+        return None
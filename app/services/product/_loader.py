@@ -0,0 +1,65 @@
+"""
+Батчинг точечных чтений товаров (паттерн DataLoader)
+Чтения по ID в рамках одного тика event loop объединяются
+в один запрос WHERE id = ANY(...)
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.models.product import Product
+
+
+class ProductLoader:
+    """Пер-сессионный загрузчик товаров, коалесцирующий чтения одного тика"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._pending: List[Tuple[int, asyncio.Future]] = []
+        self._flush_scheduled = False
+
+    async def load(self, product_id: int) -> Optional[Product]:
+        """
+        Получение товара по ID с батчингом
+
+        Args:
+            product_id: ID товара
+
+        Returns:
+            Product или None
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((product_id, future))
+
+        # Флаш откладывается на конец текущего тика: все load(),
+        # вызванные до него, попадут в один SELECT
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(lambda: asyncio.ensure_future(self._flush()))
+
+        return await future
+
+    async def _flush(self) -> None:
+        """Выполнение накопленных чтений одним запросом"""
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+
+        if not pending:
+            return
+
+        product_ids = list({product_id for product_id, _ in pending})
+        try:
+            query = select(Product).where(Product.id.in_(product_ids))
+            result = await self.session.execute(query)
+            products = {product.id: product for product in result.scalars().all()}
+        except Exception as e:
+            logger.error(f"❌ Ошибка батч-загрузки товаров {product_ids}: {e}")
+            products = {}
+
+        for product_id, future in pending:
+            if not future.done():
+                future.set_result(products.get(product_id))
@@ -5,11 +5,42 @@
 
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, lambda_stmt
 from loguru import logger
 
 from app.models.product import Product
 from app.schemas.product import ProductFilterSchema
+from app.services.cache import (
+    cache_get_json, cache_set_json, categories_cache_key, CATEGORIES_TTL_SECONDS
+)
+
+
+# Колонки карточки для клиентских списков: Core-выборка отдает легкие
+# Row-объекты без гидратации ORM (без identity map и инструментирования
+# атрибутов), атрибутный доступ для схем сохраняется
+_PRODUCT_LIST_COLS = (
+    Product.id, Product.name, Product.description, Product.price,
+    Product.image_url, Product.is_available, Product.stock_quantity,
+    Product.category, Product.min_order_quantity, Product.max_order_quantity
+)
+
+# Для админского листинга нужны все поля; tsvector при этом не тащим
+_PRODUCT_FULL_COLS = tuple(
+    col for col in Product.__table__.columns if col.name != "search_vector"
+)
+
+# Белый список сортируемых колонок: прежний getattr по имени из запроса
+# позволял сортировать по произвольному атрибуту модели и платил за
+# hasattr/getattr на каждый вызов
+_SORT_COLS = {
+    "price": Product.price,
+    "name": Product.name,
+    "created_at": Product.created_at,
+    "sort_order": Product.sort_order,
+    "stock_quantity": Product.stock_quantity,
+    "views_count": Product.views_count,
+    "popularity": Product.popularity,
+}
 
 
 class ProductCatalogService:
@@ -34,30 +65,52 @@ class ProductCatalogService:
             Dict с товарами и метаданными пагинации
         """
         try:
-            # Базовый запрос
-            query = select(Product)
+            # Базовый запрос: count(*) OVER() считает общее количество
+            # в том же проходе, что и страница — фильтры выполняются
+            # один раз вместо пары SELECT + COUNT.
+            # lambda_stmt кэширует скомпилированную форму по цепочке
+            # лямбд: каждая комбинация фильтров компилируется один раз,
+            # дальше подставляются только bind-параметры
+            query = lambda_stmt(
+                lambda: select(
+                    *_PRODUCT_FULL_COLS, func.count().over().label("full_count")
+                )
+            )
 
             # Фильтры видимости
             if not include_hidden:
-                query = query.where(Product.is_hidden == False)
+                query += lambda s: s.where(Product.is_hidden == False)
 
             # Применяем фильтры
             query = self._apply_filters(query, filters)
 
-            # Подсчет общего количества
-            total = await self._count_total(query)
-
             # Сортировка
             query = self._apply_sorting(query, filters)
 
             # Пагинация
             if filters:
                 offset = (filters.page - 1) * filters.per_page
-                query = query.offset(offset).limit(filters.per_page)
+                per_page = filters.per_page
+                query += lambda s: s.offset(offset).limit(per_page)
 
             # Выполняем запрос
             result = await self.session.execute(query)
-            products = result.scalars().all()
+            products = result.all()
+            total = products[0].full_count if products else 0
+
+            # Страница за пределами выборки: окно count(*) OVER() не
+            # вернуло ни одной строки, хотя совпадения могут быть —
+            # только на этом редком пути пересчитываем total отдельным
+            # COUNT, обычные страницы остаются одним запросом
+            if not products and filters and filters.page > 1:
+                count_query = lambda_stmt(
+                    lambda: select(func.count()).select_from(Product)
+                )
+                if not include_hidden:
+                    count_query += lambda s: s.where(Product.is_hidden == False)
+                count_query = self._apply_filters(count_query, filters)
+                count_result = await self.session.execute(count_query)
+                total = count_result.scalar() or 0
 
             # Метаданные пагинации
             pagination = self._build_pagination(filters, total)
@@ -74,7 +127,7 @@ class ProductCatalogService:
             logger.error(f"❌ Ошибка получения каталога: {e}")
             return {"products": [], "pagination": {}, "total": 0}
 
-    async def search_products(self, query: str, limit: int = 10) -> List[Product]:
+    async def search_products(self, query: str, limit: int = 10) -> List[Any]:
         """
         Поиск товаров по названию и описанию
 
@@ -83,25 +136,37 @@ class ProductCatalogService:
             limit: Максимальное количество результатов
 
         Returns:
-            Список найденных товаров
+            Список строк с полями карточки товара
         """
         try:
             search_pattern = f"%{query.lower()}%"
 
-            sql_query = select(Product).where(
-                and_(
-                    Product.is_available == True,
-                    Product.is_hidden == False,
-                    or_(
-                        func.lower(Product.name).like(search_pattern),
-                        func.lower(Product.description).like(search_pattern),
-                        func.lower(Product.tags).like(search_pattern)
+            # lambda_stmt кэширует скомпилированную форму запроса по
+            # code-объекту лямбды; замыкания (запрос, лимит) становятся
+            # bound-параметрами, и повторные вызовы не платят за
+            # построение и компиляцию конструкции select.
+            # Поиск по словам идет через GIN-индекс search_vector,
+            # подстрочное совпадение по названию — через триграммный
+            # индекс idx_product_name_trgm; seq scan по description/tags
+            # больше не нужен
+            sql_query = lambda_stmt(
+                lambda: select(*_PRODUCT_LIST_COLS).where(
+                    and_(
+                        Product.is_available == True,
+                        Product.is_hidden == False,
+                        or_(
+                            Product.search_vector.op("@@")(
+                                func.plainto_tsquery("russian", query)
+                            ),
+                            func.lower(Product.name).like(search_pattern)
+                        )
                     )
-                )
-            ).order_by(Product.sort_order).limit(limit)
+                ).order_by(Product.sort_order)
+            )
+            sql_query += lambda s: s.limit(limit)
 
             result = await self.session.execute(sql_query)
-            products = result.scalars().all()
+            products = result.all()
 
             logger.info(f"🔍 Найдено товаров по запросу '{query}': {len(products)}")
             return products
@@ -118,15 +183,31 @@ class ProductCatalogService:
             Список уникальных категорий
         """
         try:
-            query = select(Product.category).where(
-                and_(
-                    Product.category.isnot(None),
-                    Product.is_hidden == False
-                )
-            ).distinct()
+            # Список категорий меняется редко — читаем из Redis
+            cached = await cache_get_json(categories_cache_key())
+            if cached is not None:
+                return cached
+
+            # Полностью статичный запрос — компилируется один раз.
+            # ORDER BY category позволяет планировщику снять DISTINCT
+            # через проход по idx_product_category; фильтр IS NOT NULL
+            # делает пост-фильтрацию в Python ненужной
+            query = lambda_stmt(
+                lambda: select(Product.category).where(
+                    and_(
+                        Product.category.isnot(None),
+                        Product.category != "",
+                        Product.is_hidden == False
+                    )
+                ).distinct().order_by(Product.category)
+            )
 
             result = await self.session.execute(query)
-            categories = [cat for cat in result.scalars().all() if cat]
+            categories = list(result.scalars().all())
+
+            await cache_set_json(
+                categories_cache_key(), categories, CATEGORIES_TTL_SECONDS
+            )
 
             logger.info(f"📂 Найдено категорий: {len(categories)}")
             return categories
@@ -135,7 +216,7 @@ class ProductCatalogService:
             logger.error(f"❌ Ошибка получения категорий: {e}")
             return []
 
-    async def get_products_by_category(self, category: str, limit: int = 20) -> List[Product]:
+    async def get_products_by_category(self, category: str, limit: int = 20) -> List[Any]:
         """
         Получение товаров по категории
 
@@ -144,19 +225,22 @@ class ProductCatalogService:
             limit: Максимальное количество товаров
 
         Returns:
-            Список товаров категории
+            Список строк с полями карточки товара
         """
         try:
-            query = select(Product).where(
-                and_(
-                    Product.category == category,
-                    Product.is_available == True,
-                    Product.is_hidden == False
-                )
-            ).order_by(Product.sort_order).limit(limit)
+            query = lambda_stmt(
+                lambda: select(*_PRODUCT_LIST_COLS).where(
+                    and_(
+                        Product.category == category,
+                        Product.is_available == True,
+                        Product.is_hidden == False
+                    )
+                ).order_by(Product.sort_order)
+            )
+            query += lambda s: s.limit(limit)
 
             result = await self.session.execute(query)
-            products = result.scalars().all()
+            products = result.all()
 
             logger.info(f"📂 Товаров в категории '{category}': {len(products)}")
             return products
@@ -165,7 +249,7 @@ class ProductCatalogService:
             logger.error(f"❌ Ошибка получения товаров категории {category}: {e}")
             return []
 
-    async def get_featured_products(self, limit: int = 10) -> List[Product]:
+    async def get_featured_products(self, limit: int = 10) -> List[Any]:
         """
         Получение рекомендуемых товаров
 
@@ -173,23 +257,27 @@ class ProductCatalogService:
             limit: Максимальное количество товаров
 
         Returns:
-            Список рекомендуемых товаров
+            Список строк с полями карточки товара
         """
         try:
-            # Сортируем по популярности (просмотры + заказы)
-            query = select(Product).where(
-                and_(
-                    Product.is_available == True,
-                    Product.is_hidden == False,
-                    Product.stock_quantity > 0
+            # Сортируем по материализованной популярности — прямой
+            # backward-scan по индексу idx_product_featured
+            query = lambda_stmt(
+                lambda: select(*_PRODUCT_LIST_COLS).where(
+                    and_(
+                        Product.is_available == True,
+                        Product.is_hidden == False,
+                        Product.stock_quantity > 0
+                    )
+                ).order_by(
+                    Product.popularity.desc(),
+                    Product.created_at.desc()
                 )
-            ).order_by(
-                (Product.views_count + Product.orders_count * 10).desc(),
-                Product.created_at.desc()
-            ).limit(limit)
+            )
+            query += lambda s: s.limit(limit)
 
             result = await self.session.execute(query)
-            products = result.scalars().all()
+            products = result.all()
 
             logger.info(f"⭐ Рекомендуемых товаров: {len(products)}")
             return products
@@ -199,43 +287,55 @@ class ProductCatalogService:
             return []
 
     def _apply_filters(self, query, filters: Optional[ProductFilterSchema]):
-        """Применение фильтров к запросу"""
+        """Применение фильтров к запросу
+
+        Значения фильтров выносятся в локальные переменные: замыкания
+        лямбд превращают их в bind-параметры, не ломая кэш компиляции.
+        """
         if not filters:
             return query
 
         # Фильтр по категории
         if filters.category:
-            query = query.where(Product.category == filters.category)
+            category = filters.category
+            query += lambda s: s.where(Product.category == category)
 
         # Фильтр по доступности
         if filters.is_available is not None:
-            query = query.where(Product.is_available == filters.is_available)
+            is_available = filters.is_available
+            query += lambda s: s.where(Product.is_available == is_available)
 
         # Фильтр по видимости
         if filters.is_hidden is not None:
-            query = query.where(Product.is_hidden == filters.is_hidden)
+            is_hidden = filters.is_hidden
+            query += lambda s: s.where(Product.is_hidden == is_hidden)
 
         # Фильтр по наличию
         if filters.in_stock is not None:
             if filters.in_stock:
-                query = query.where(Product.stock_quantity > 0)
+                query += lambda s: s.where(Product.stock_quantity > 0)
             else:
-                query = query.where(Product.stock_quantity <= 0)
+                query += lambda s: s.where(Product.stock_quantity <= 0)
 
         # Фильтр по цене
         if filters.min_price is not None:
-            query = query.where(Product.price >= filters.min_price)
+            min_price = filters.min_price
+            query += lambda s: s.where(Product.price >= min_price)
         if filters.max_price is not None:
-            query = query.where(Product.price <= filters.max_price)
+            max_price = filters.max_price
+            query += lambda s: s.where(Product.price <= max_price)
 
-        # Поиск по названию
+        # Поиск по названию: FTS-индекс + триграммы вместо
+        # последовательного скана трех текстовых колонок
         if filters.search:
-            search_pattern = f"%{filters.search.lower()}%"
-            query = query.where(
+            search = filters.search
+            search_pattern = f"%{search.lower()}%"
+            query += lambda s: s.where(
                 or_(
-                    func.lower(Product.name).like(search_pattern),
-                    func.lower(Product.description).like(search_pattern),
-                    func.lower(Product.tags).like(search_pattern)
+                    Product.search_vector.op("@@")(
+                        func.plainto_tsquery("russian", search)
+                    ),
+                    func.lower(Product.name).like(search_pattern)
                 )
             )
 
@@ -243,31 +343,29 @@ class ProductCatalogService:
 
     def _apply_sorting(self, query, filters: Optional[ProductFilterSchema]):
         """Применение сортировки к запросу"""
-        if filters and filters.sort_by:
-            if hasattr(Product, filters.sort_by):
-                sort_column = getattr(Product, filters.sort_by)
-                if filters.sort_desc:
-                    query = query.order_by(sort_column.desc())
-                else:
-                    query = query.order_by(sort_column)
-            else:
-                # По умолчанию сортировка
-                query = query.order_by(Product.sort_order, Product.created_at.desc())
+        sort_column = (
+            _SORT_COLS.get(filters.sort_by)
+            if filters and filters.sort_by else None
+        )
+
+        if sort_column is None:
+            # По умолчанию сортировка
+            query += lambda s: s.order_by(Product.sort_order, Product.created_at.desc())
+        elif filters.sort_desc:
+            # Колонка — SQL-выражение, а не bind-параметр, поэтому
+            # ключ кэша задаем явно через track_on
+            query = query.add_criteria(
+                lambda s: s.order_by(sort_column.desc()),
+                track_on=(filters.sort_by,)
+            )
         else:
-            query = query.order_by(Product.sort_order, Product.created_at.desc())
+            query = query.add_criteria(
+                lambda s: s.order_by(sort_column),
+                track_on=(filters.sort_by,)
+            )
 
         return query
 
-    async def _count_total(self, query) -> int:
-        """Подсчет общего количества товаров"""
-        try:
-            count_query = select(func.count(Product.id)).select_from(query.subquery())
-            total_result = await self.session.execute(count_query)
-            return total_result.scalar()
-        except Exception as e:
-            logger.error(f"❌ Ошибка подсчета товаров: {e}")
-            return 0
-
     def _build_pagination(self, filters: Optional[ProductFilterSchema], total: int) -> Dict[str, Any]:
         """Построение метаданных пагинации"""
         if not filters:
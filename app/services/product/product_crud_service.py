@@ -3,13 +3,15 @@ CRUD сервис для товаров
 Базовые операции создания, чтения, обновления и удаления
 """
 
-from typing import Optional, Dict, Any
+from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, insert, update, delete, exists
 from loguru import logger
 
 from app.models.product import Product
 from app.schemas.product import ProductCreateSchema, ProductUpdateSchema
+from app.services.cache import invalidate_catalog_cache
+from app.services.product._loader import ProductLoader
 
 
 class ProductCRUDService:
@@ -17,6 +19,7 @@ class ProductCRUDService:
 
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.loader = ProductLoader(session)
 
     async def get_by_id(self, product_id: int, increment_views: bool = True) -> Optional[Product]:
         """
@@ -30,13 +33,13 @@ class ProductCRUDService:
             Product или None
         """
         try:
-            query = select(Product).where(Product.id == product_id)
-            result = await self.session.execute(query)
-            product = result.scalar_one_or_none()
+            # Чтения одного тика event loop коалесцируются загрузчиком
+            # в один запрос WHERE id = ANY(...)
+            product = await self.loader.load(product_id)
 
             if product and increment_views:
+                # Просмотр буферизуется в памяти, коммит не нужен
                 product.increment_views()
-                await self.session.commit()
 
             return product
 
@@ -58,8 +61,11 @@ class ProductCRUDService:
             product = Product(**product_data.model_dump())
 
             self.session.add(product)
+            # eager_defaults на модели: id/created_at/popularity приходят
+            # в INSERT ... RETURNING, отдельный refresh-SELECT не нужен
             await self.session.commit()
-            await self.session.refresh(product)
+
+            await invalidate_catalog_cache()
 
             logger.success(f"✅ Создан товар: {product.name} (ID: {product.id})")
             return product
@@ -69,6 +75,43 @@ class ProductCRUDService:
             await self.session.rollback()
             return None
 
+    async def bulk_create(self, items: List[ProductCreateSchema]) -> List[Product]:
+        """
+        Массовое создание товаров одним INSERT ... RETURNING
+
+        Один запрос и один коммит на всю партию вместо add/commit/refresh
+        на каждый товар. Для очень больших загрузок без возврата ORM-строк
+        есть BulkImportService (COPY).
+
+        Args:
+            items: Данные для создания товаров
+
+        Returns:
+            Список созданных товаров (пустой при ошибке)
+        """
+        try:
+            if not items:
+                return []
+
+            query = (
+                insert(Product)
+                .values([item.model_dump() for item in items])
+                .returning(Product)
+            )
+            result = await self.session.execute(query)
+            products = list(result.scalars().all())
+            await self.session.commit()
+
+            await invalidate_catalog_cache()
+
+            logger.success(f"✅ Создано товаров одной партией: {len(products)}")
+            return products
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка массового создания товаров: {e}")
+            await self.session.rollback()
+            return []
+
     async def update(self, product_id: int, product_data: ProductUpdateSchema) -> Optional[Product]:
         """
         Обновление товара
@@ -81,18 +124,29 @@ class ProductCRUDService:
             Обновленный товар или None
         """
         try:
-            product = await self.get_by_id(product_id, increment_views=False)
+            update_data = product_data.model_dump(exclude_unset=True)
+            if not update_data:
+                return await self.get_by_id(product_id, increment_views=False)
+
+            # UPDATE ... RETURNING: обновление и чтение результата одним
+            # запросом вместо пары SELECT + UPDATE + refresh
+            query = (
+                update(Product)
+                .where(Product.id == product_id)
+                .values(**update_data)
+                .returning(Product)
+            )
+            result = await self.session.execute(query)
+            product = result.scalar_one_or_none()
+
             if not product:
                 logger.warning(f"⚠️ Товар {product_id} не найден")
+                await self.session.rollback()
                 return None
 
-            # Обновляем поля
-            update_data = product_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(product, field, value)
-
             await self.session.commit()
-            await self.session.refresh(product)
+
+            await invalidate_catalog_cache()
 
             logger.success(f"✅ Обновлен товар: {product.name} (ID: {product.id})")
             return product
@@ -115,11 +169,13 @@ class ProductCRUDService:
         try:
             # TODO: Добавить проверку связанных заказов
 
-            query = delete(Product).where(Product.id == product_id)
+            # RETURNING id: проверка существования и удаление одним запросом
+            query = delete(Product).where(Product.id == product_id).returning(Product.id)
             result = await self.session.execute(query)
             await self.session.commit()
 
-            if result.rowcount > 0:
+            if result.scalar_one_or_none() is not None:
+                await invalidate_catalog_cache()
                 logger.success(f"✅ Удален товар ID: {product_id}")
                 return True
             else:
@@ -142,9 +198,11 @@ class ProductCRUDService:
             True если товар существует
         """
         try:
-            query = select(Product.id).where(Product.id == product_id)
+            # EXISTS: планировщик останавливается на первой найденной
+            # строке PK-индекса, в ответе один булев скаляр
+            query = select(exists().where(Product.id == product_id))
             result = await self.session.execute(query)
-            return result.scalar_one_or_none() is not None
+            return bool(result.scalar())
 
         except Exception as e:
             logger.error(f"❌ Ошибка проверки существования товара {product_id}: {e}")
@@ -165,25 +223,37 @@ class ProductCRUDService:
             if not product:
                 return {}
 
-            # TODO: Добавить запросы для получения статистики заказов
-            # total_ordered_quantity = await self._get_total_ordered_quantity(product_id)
-            # revenue = await self._get_product_revenue(product_id)
-            # last_ordered = await self._get_last_order_date(product_id)
-
-            return {
-                "views_count": product.views_count,
-                "orders_count": product.orders_count,
-                "total_ordered_quantity": 0,  # TODO
-                "revenue": 0.0,  # TODO
-                "last_ordered": None,  # TODO
-                "current_stock": product.stock_quantity,
-                "is_low_stock": product.is_low_stock
-            }
+            return self.build_stats(product)
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения статистики товара {product_id}: {e}")
             return {}
 
+    def build_stats(self, product: Product) -> Dict[str, Any]:
+        """
+        Сборка статистики из уже загруженного товара
+
+        Args:
+            product: Загруженный товар
+
+        Returns:
+            Словарь со статистикой
+        """
+        # TODO: Добавить запросы для получения статистики заказов
+        # total_ordered_quantity = await self._get_total_ordered_quantity(product_id)
+        # revenue = await self._get_product_revenue(product_id)
+        # last_ordered = await self._get_last_order_date(product_id)
+
+        return {
+            "views_count": product.views_count,
+            "orders_count": product.orders_count,
+            "total_ordered_quantity": 0,  # TODO
+            "revenue": 0.0,  # TODO
+            "last_ordered": None,  # TODO
+            "current_stock": product.stock_quantity,
+            "is_low_stock": product.is_low_stock
+        }
+
     # TODO: Методы для получения статистики заказов
     # async def _get_total_ordered_quantity(self, product_id: int) -> int:
     # async def _get_product_revenue(self, product_id: int) -> float:
@@ -4,9 +4,13 @@
 """
 
 import os
+import asyncio
 import hashlib
 import aiofiles
-from typing import Optional
+import aiofiles.os
+import aiofiles.tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable, Optional, Tuple
 from PIL import Image
 from io import BytesIO
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +21,101 @@ from app.schemas.product import ProductUpdateSchema
 from app.core.config import marketplace_settings
 
 
+# Пул процессов для CPU-bound обработки изображений: декодирование,
+# ресайз и кодирование не блокируют event loop и используют все ядра
+_IMAGE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Размеры WebP-миниатюр, генерируемых при загрузке
+_THUMBNAIL_SIZES = (256, 512, 1024)
+
+
+def _probe_bytes(image_data: bytes) -> Tuple[int, int, Optional[str]]:
+    """
+    Чтение размеров и формата изображения (выполняется в пуле процессов)
+
+    Args:
+        image_data: Данные изображения
+
+    Returns:
+        Кортеж (ширина, высота, формат)
+    """
+    with Image.open(BytesIO(image_data)) as img:
+        return img.width, img.height, img.format
+
+
+def _optimize_bytes(image_data: bytes) -> bytes:
+    """
+    Оптимизация изображения (выполняется в пуле процессов)
+
+    Args:
+        image_data: Исходные данные изображения
+
+    Returns:
+        Оптимизированные данные изображения
+    """
+    try:
+        with Image.open(BytesIO(image_data)) as img:
+            # Конвертируем в RGB если нужно
+            if img.mode in ('RGBA', 'LA', 'P'):
+                # Создаем белый фон для прозрачных изображений
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+
+            # Изменяем размер если слишком большое
+            max_size = (1920, 1920)
+            if img.width > max_size[0] or img.height > max_size[1]:
+                img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+            # Сохраняем в оптимизированном формате
+            output = BytesIO()
+            img.save(
+                output,
+                format='JPEG',
+                quality=85,
+                optimize=True,
+                progressive=True
+            )
+
+            return output.getvalue()
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка оптимизации изображения: {e}")
+        return image_data  # Возвращаем исходные данные если не удалось оптимизировать
+
+
+def _thumbnail_bytes(image_data: bytes) -> dict:
+    """
+    Генерация WebP-миниатюр (выполняется в пуле процессов)
+
+    Args:
+        image_data: Данные изображения
+
+    Returns:
+        Словарь {размер: данные WebP}
+    """
+    variants = {}
+    try:
+        with Image.open(BytesIO(image_data)) as img:
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            for size in _THUMBNAIL_SIZES:
+                thumbnail = img.copy()
+                thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+                output = BytesIO()
+                thumbnail.save(output, format='WEBP', quality=80, method=6)
+                variants[size] = output.getvalue()
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка генерации миниатюр: {e}")
+
+    return variants
+
+
 class ProductImageService:
     """Сервис для работы с изображениями товаров"""
 
@@ -51,24 +150,57 @@ class ProductImageService:
 
             # Создаем директорию если не существует
             upload_dir = os.path.join(marketplace_settings.UPLOAD_PATH, "products")
-            os.makedirs(upload_dir, exist_ok=True)
+            await aiofiles.os.makedirs(upload_dir, exist_ok=True)
 
-            # Генерируем уникальное имя файла
+            # Имя файла контент-адресное: хеш исходных байт
             file_extension = self._get_file_extension(filename)
-            new_filename = await self._generate_filename(product_id, image_data, file_extension)
+            new_filename = await self._generate_filename(image_data, file_extension)
             file_path = os.path.join(upload_dir, new_filename)
 
-            # Оптимизируем изображение если нужно
-            if optimize:
-                image_data = await self._optimize_image(image_data)
-
-            # Сохраняем файл
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(image_data)
+            # Дедупликация: то же изображение уже лежит на диске —
+            # пропускаем повторный re-encode и запись
+            loop = asyncio.get_running_loop()
+            if not await aiofiles.os.path.exists(file_path):
+                # Оптимизируем изображение если нужно
+                if optimize:
+                    image_data = await self._optimize_image(image_data)
+
+                # Сохраняем файл
+                await self._write_file_chunked(file_path, image_data)
+
+                # WebP-миниатюры для карточек каталога: раздача остается
+                # статикой, браузер берет наименьший подходящий файл
+                # (<имя>_<размер>.webp рядом с оригиналом)
+                variants = await loop.run_in_executor(
+                    _IMAGE_POOL, _thumbnail_bytes, image_data
+                )
+                file_stem = os.path.splitext(new_filename)[0]
+                for size, variant_data in variants.items():
+                    variant_path = os.path.join(upload_dir, f"{file_stem}_{size}.webp")
+                    await self._write_file_chunked(variant_path, variant_data)
+            else:
+                # Дедуп-попадание: метаданные снимаем с уже сохраненного файла
+                async with aiofiles.open(file_path, 'rb') as f:
+                    image_data = await f.read()
+
+            # Метаданные пишем вместе с путем: get_image_info читает
+            # их из БД без обращения к диску и декодирования
+            try:
+                width, height, image_format = await loop.run_in_executor(
+                    _IMAGE_POOL, _probe_bytes, image_data
+                )
+            except Exception:
+                width = height = image_format = None
 
-            # Обновляем путь в базе данных
             relative_path = f"products/{new_filename}"
-            await self._update_product_image_path(product_id, relative_path)
+            await self._update_product_image_meta(
+                product_id,
+                relative_path,
+                width=width,
+                height=height,
+                size_bytes=len(image_data),
+                image_format=image_format
+            )
 
             logger.success(f"✅ Сохранено изображение товара {product_id}: {relative_path}")
             return relative_path
@@ -77,6 +209,57 @@ class ProductImageService:
             logger.error(f"❌ Ошибка сохранения изображения товара {product_id}: {e}")
             return None
 
+    async def save_product_image_stream(
+        self,
+        product_id: int,
+        stream: AsyncIterable[bytes],
+        filename: str,
+        optimize: bool = True
+    ) -> Optional[str]:
+        """
+        Сохранение изображения из потока загрузки
+
+        Чанки пишутся во временный файл с контролем размера, поэтому
+        на время приема от клиента файл не держится в памяти целиком.
+
+        Args:
+            product_id: ID товара
+            stream: Асинхронный итератор чанков изображения
+            filename: Имя файла
+            optimize: Оптимизировать изображение
+
+        Returns:
+            Путь к сохраненному файлу или None
+        """
+        temp_path = None
+        try:
+            total_size = 0
+            async with aiofiles.tempfile.NamedTemporaryFile('wb', delete=False) as temp_file:
+                temp_path = temp_file.name
+                async for chunk in stream:
+                    total_size += len(chunk)
+                    if total_size > marketplace_settings.MAX_FILE_SIZE:
+                        logger.warning(
+                            f"⚠️ Превышен размер загрузки изображения товара {product_id}"
+                        )
+                        return None
+                    await temp_file.write(chunk)
+
+            # Дальше конвейеру (валидация, decode, re-encode) нужны
+            # полные байты — читаем их уже после окончания приема
+            async with aiofiles.open(temp_path, 'rb') as f:
+                image_data = await f.read()
+
+            return await self.save_product_image(product_id, image_data, filename, optimize)
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка потоковой загрузки изображения товара {product_id}: {e}")
+            return None
+
+        finally:
+            if temp_path and await aiofiles.os.path.exists(temp_path):
+                await aiofiles.os.remove(temp_path)
+
     async def delete_product_image(self, product_id: int) -> bool:
         """
         Удаление изображения товара
@@ -93,13 +276,29 @@ class ProductImageService:
             if not product or not product.image_path:
                 return True  # Нет изображения для удаления
 
-            # Удаляем файл
+            # Файл контент-адресный и может разделяться несколькими
+            # товарами — удаляем с диска только когда ссылок не осталось
+            from sqlalchemy import select, func
+            references = await self.session.execute(
+                select(func.count()).select_from(Product).where(
+                    Product.image_path == product.image_path,
+                    Product.id != product_id
+                )
+            )
+
             file_path = os.path.join(marketplace_settings.UPLOAD_PATH, product.image_path)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            if references.scalar() == 0 and await aiofiles.os.path.exists(file_path):
+                await aiofiles.os.remove(file_path)
 
-            # Очищаем путь в БД
-            await self._update_product_image_path(product_id, None)
+                # Вместе с оригиналом удаляем его WebP-миниатюры
+                file_stem = os.path.splitext(file_path)[0]
+                for size in _THUMBNAIL_SIZES:
+                    variant_path = f"{file_stem}_{size}.webp"
+                    if await aiofiles.os.path.exists(variant_path):
+                        await aiofiles.os.remove(variant_path)
+
+            # Очищаем путь и метаданные в БД
+            await self._update_product_image_meta(product_id, None)
 
             logger.info(f"📦 Удалено изображение товара {product_id}")
             return True
@@ -123,34 +322,40 @@ class ProductImageService:
             if not product:
                 return None
 
-            result = {
-                "has_image": bool(product.image_path),
-                "image_path": product.image_path,
-                "image_url": product.image_url
-            }
-
-            # Если есть локальный файл, получаем его размер
-            if product.image_path:
-                file_path = os.path.join(marketplace_settings.UPLOAD_PATH, product.image_path)
-                if os.path.exists(file_path):
-                    file_size = os.path.getsize(file_path)
-                    result["file_size"] = file_size
-
-                    # Получаем размеры изображения
-                    try:
-                        with Image.open(file_path) as img:
-                            result["width"] = img.width
-                            result["height"] = img.height
-                            result["format"] = img.format
-                    except Exception:
-                        pass
-
-            return result
+            return self.build_image_info(product)
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения информации об изображении товара {product_id}: {e}")
             return None
 
+    def build_image_info(self, product: Product) -> dict:
+        """
+        Сборка информации об изображении из уже загруженного товара
+
+        Args:
+            product: Загруженный товар
+
+        Returns:
+            Словарь с информацией об изображении
+        """
+        result = {
+            "has_image": bool(product.image_path),
+            "image_path": product.image_path,
+            "image_url": product.image_url
+        }
+
+        # Метаданные записаны при загрузке — чтение обходится
+        # без файловой системы и декодирования
+        if product.image_path:
+            if product.image_size_bytes is not None:
+                result["file_size"] = product.image_size_bytes
+            if product.image_width is not None:
+                result["width"] = product.image_width
+                result["height"] = product.image_height
+                result["format"] = product.image_format
+
+        return result
+
     async def _validate_image(self, image_data: bytes, filename: str) -> dict:
         """
         Валидация изображения
@@ -180,20 +385,25 @@ class ProductImageService:
                 }
 
             # Проверяем что это действительно изображение
+            # (декодирование выносим в пул процессов)
             try:
-                with Image.open(BytesIO(image_data)) as img:
-                    # Проверяем размеры изображения
-                    if img.width < 100 or img.height < 100:
-                        return {
-                            "valid": False,
-                            "reason": "Изображение слишком маленькое. Минимум: 100x100 пикселей"
-                        }
-
-                    if img.width > 4000 or img.height > 4000:
-                        return {
-                            "valid": False,
-                            "reason": "Изображение слишком большое. Максимум: 4000x4000 пикселей"
-                        }
+                loop = asyncio.get_running_loop()
+                width, height, _ = await loop.run_in_executor(
+                    _IMAGE_POOL, _probe_bytes, image_data
+                )
+
+                # Проверяем размеры изображения
+                if width < 100 or height < 100:
+                    return {
+                        "valid": False,
+                        "reason": "Изображение слишком маленькое. Минимум: 100x100 пикселей"
+                    }
+
+                if width > 4000 or height > 4000:
+                    return {
+                        "valid": False,
+                        "reason": "Изображение слишком большое. Максимум: 4000x4000 пикселей"
+                    }
 
             except Exception:
                 return {
@@ -209,7 +419,7 @@ class ProductImageService:
 
     async def _optimize_image(self, image_data: bytes) -> bytes:
         """
-        Оптимизация изображения
+        Оптимизация изображения в пуле процессов
 
         Args:
             image_data: Исходные данные изображения
@@ -217,57 +427,44 @@ class ProductImageService:
         Returns:
             Оптимизированные данные изображения
         """
-        try:
-            with Image.open(BytesIO(image_data)) as img:
-                # Конвертируем в RGB если нужно
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Создаем белый фон для прозрачных изображений
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-
-                # Изменяем размер если слишком большое
-                max_size = (1920, 1920)
-                if img.width > max_size[0] or img.height > max_size[1]:
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-                # Сохраняем в оптимизированном формате
-                output = BytesIO()
-                img.save(
-                    output,
-                    format='JPEG',
-                    quality=85,
-                    optimize=True,
-                    progressive=True
-                )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_IMAGE_POOL, _optimize_bytes, image_data)
 
-                return output.getvalue()
+    async def _write_file_chunked(self, file_path: str, data: bytes) -> None:
+        """
+        Запись файла порциями по 64 КБ
 
-        except Exception as e:
-            logger.error(f"❌ Ошибка оптимизации изображения: {e}")
-            return image_data  # Возвращаем исходные данные если не удалось оптимизировать
+        Большой blob уходит в поток aiofiles кусками — event loop не
+        ждет сериализации всего буфера одним вызовом.
+
+        Args:
+            file_path: Путь к файлу
+            data: Данные для записи
+        """
+        view = memoryview(data)
+        async with aiofiles.open(file_path, 'wb') as f:
+            for offset in range(0, len(view), 1 << 16):
+                await f.write(view[offset:offset + (1 << 16)])
 
-    async def _generate_filename(self, product_id: int, image_data: bytes, extension: str) -> str:
+    async def _generate_filename(self, image_data: bytes, extension: str) -> str:
         """
-        Генерация уникального имени файла
+        Генерация контент-адресного имени файла
+
+        Одинаковые изображения разных товаров получают одно имя,
+        что позволяет дедуплицировать файлы на диске.
 
         Args:
-            product_id: ID товара
             image_data: Данные изображения
             extension: Расширение файла
 
         Returns:
-            Уникальное имя файла
+            Имя файла, построенное от хеша содержимого
         """
-        # Создаем хеш от данных изображения
-        image_hash = hashlib.md5(image_data).hexdigest()[:8]
-
-        # Генерируем имя файла
-        filename = f"product_{product_id}_{image_hash}{extension}"
+        # Создаем хеш от данных изображения; usedforsecurity=False
+        # позволяет OpenSSL выбрать аппаратно-ускоренный SHA-NI бэкенд
+        image_hash = hashlib.sha256(image_data, usedforsecurity=False).hexdigest()[:16]
 
-        return filename
+        return f"{image_hash}{extension}"
 
     def _get_file_extension(self, filename: str) -> str:
         """Получение расширения файла"""
@@ -284,25 +481,55 @@ class ProductImageService:
             logger.error(f"❌ Ошибка получения товара {product_id}: {e}")
             return None
 
-    async def _update_product_image_path(self, product_id: int, image_path: Optional[str]) -> bool:
+    async def _update_product_image_meta(
+        self,
+        product_id: int,
+        image_path: Optional[str],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        size_bytes: Optional[int] = None,
+        image_format: Optional[str] = None
+    ) -> bool:
         """
-        Обновление пути к изображению в БД
+        Обновление пути и метаданных изображения в БД
 
         Args:
             product_id: ID товара
-            image_path: Новый путь к изображению
+            image_path: Новый путь к изображению (None — очистка)
+            width: Ширина изображения в пикселях
+            height: Высота изображения в пикселях
+            size_bytes: Размер файла в байтах
+            image_format: Формат файла (JPEG, PNG, WEBP)
 
         Returns:
             True если обновлено успешно
         """
         try:
-            product = await self._get_product(product_id)
-            if not product:
+            # UPDATE ... RETURNING: проверка существования и запись
+            # пути одним запросом вместо SELECT + UPDATE
+            from sqlalchemy import update
+            query = (
+                update(Product)
+                .where(Product.id == product_id)
+                .values(
+                    image_path=image_path,
+                    image_width=width,
+                    image_height=height,
+                    image_size_bytes=size_bytes,
+                    image_format=image_format
+                )
+                .returning(Product.id)
+            )
+            result = await self.session.execute(query)
+            if result.scalar_one_or_none() is None:
+                await self.session.rollback()
                 return False
 
-            product.image_path = image_path
             await self.session.commit()
 
+            from app.services.cache import invalidate_catalog_cache
+            await invalidate_catalog_cache()
+
             return True
 
         except Exception as e:
@@ -3,14 +3,30 @@
 Резервирование, восстановление, уведомления о низком остатке
 """
 
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, case, and_, or_, bindparam, func, lambda_stmt
 from loguru import logger
 
 from app.models.product import Product
 from app.core.config import marketplace_settings
-from app.services.telegram.message_service import MessageService
+from app.services.cache import (
+    low_stock_cache_key, cache_get_json, cache_set_json,
+    invalidate_low_stock_cache, invalidate_catalog_cache,
+    LOW_STOCK_TTL_SECONDS
+)
+from app.services.telegram.message_service import message_service
+from app.services import low_stock_notifier
+
+# Порог низкого остатка фиксируется при импорте: обращение к локальной
+# константе на горячих путях дешевле цепочки атрибутов pydantic-настроек
+_LOW_STOCK_DEFAULT = marketplace_settings.LOW_STOCK_THRESHOLD
+
+
+def reload_thresholds() -> None:
+    """Перечитывает порог низкого остатка из настроек (для горячей перезагрузки)"""
+    global _LOW_STOCK_DEFAULT
+    _LOW_STOCK_DEFAULT = marketplace_settings.LOW_STOCK_THRESHOLD
 
 
 class ProductStockService:
@@ -18,7 +34,8 @@ class ProductStockService:
 
     def __init__(self, session: AsyncSession):
         self.session = session
-        self.message_service = MessageService()
+        # Общий stateless-синглтон, без аллокации на каждый запрос
+        self.message_service = message_service
 
     async def update_stock(self, product_id: int, new_quantity: int) -> bool:
         """
@@ -32,19 +49,29 @@ class ProductStockService:
             True если обновлено успешно
         """
         try:
-            product = await self._get_product(product_id)
-            if not product:
-                return False
+            # Одно UPDATE ... RETURNING вместо SELECT + изменение атрибута +
+            # UPDATE при коммите — один round-trip и один коммит на операцию
+            query = (
+                update(Product)
+                .where(Product.id == product_id)
+                .values(stock_quantity=new_quantity)
+                .returning(Product)
+            )
+            result = await self.session.execute(query)
+            product = result.scalar_one_or_none()
 
-            old_quantity = product.stock_quantity
-            product.stock_quantity = new_quantity
+            if product is None:
+                await self.session.rollback()
+                return False
 
             await self.session.commit()
+            await invalidate_low_stock_cache()
+            await invalidate_catalog_cache()
 
             # Проверяем уведомление о низком остатке
             await self._check_low_stock_notification(product)
 
-            logger.info(f"📦 Остаток товара {product.name}: {old_quantity} → {new_quantity}")
+            logger.info(f"📦 Остаток товара {product.name}: → {new_quantity}")
             return True
 
         except Exception as e:
@@ -64,22 +91,38 @@ class ProductStockService:
             True если зарезервировано успешно
         """
         try:
-            product = await self._get_product(product_id)
-            if not product:
-                logger.warning(f"⚠️ Товар {product_id} не найден для резервирования")
-                return False
-
-            if not product.can_order_quantity(quantity):
-                logger.warning(f"⚠️ Недостаточно товара {product.name} для резервирования {quantity}")
-                return False
+            # Одно условное обновление вместо SELECT + проверка + UPDATE:
+            # лимиты заказа и достаточность остатка проверяет сама БД,
+            # окна для гонки конкурентных заказов нет
+            query = (
+                update(Product)
+                .where(
+                    Product.id == product_id,
+                    Product.is_available == True,
+                    Product.is_hidden == False,
+                    Product.stock_quantity >= quantity,
+                    Product.min_order_quantity <= quantity,
+                    or_(
+                        Product.max_order_quantity.is_(None),
+                        Product.max_order_quantity >= quantity
+                    )
+                )
+                .values(stock_quantity=Product.stock_quantity - quantity)
+                .returning(Product.name)
+            )
+            result = await self.session.execute(query)
+            row = result.first()
 
-            success = await product.update_stock(-quantity)
-            if not success:
+            if row is None:
+                logger.warning(f"⚠️ Не удалось зарезервировать {quantity} шт. товара {product_id}")
+                await self.session.rollback()
                 return False
 
             await self.session.commit()
+            await invalidate_low_stock_cache()
+            await invalidate_catalog_cache()
 
-            logger.info(f"📦 Зарезервировано {quantity} шт. товара {product.name}")
+            logger.info(f"📦 Зарезервировано {quantity} шт. товара {row.name}")
             return True
 
         except Exception as e:
@@ -99,17 +142,25 @@ class ProductStockService:
             True если восстановлено успешно
         """
         try:
-            product = await self._get_product(product_id)
-            if not product:
-                return False
+            # Одно обновление с RETURNING вместо SELECT + UPDATE
+            query = (
+                update(Product)
+                .where(Product.id == product_id)
+                .values(stock_quantity=Product.stock_quantity + quantity)
+                .returning(Product.name)
+            )
+            result = await self.session.execute(query)
+            row = result.first()
 
-            success = await product.update_stock(quantity)
-            if not success:
+            if row is None:
+                await self.session.rollback()
                 return False
 
             await self.session.commit()
+            await invalidate_low_stock_cache()
+            await invalidate_catalog_cache()
 
-            logger.info(f"📦 Восстановлено {quantity} шт. товара {product.name}")
+            logger.info(f"📦 Восстановлено {quantity} шт. товара {row.name}")
             return True
 
         except Exception as e:
@@ -128,29 +179,63 @@ class ProductStockService:
             True если все товары зарезервированы успешно
         """
         try:
-            # Сначала проверяем доступность всех товаров
+            # Все позиции читаем одним запросом вместо SELECT на каждую;
+            # FOR UPDATE держит строки залоченными между проверкой
+            # и списанием — конкурентный заказ не устроит oversell.
+            # SKIP LOCKED: строка, занятая конкурентным резервом, сразу
+            # считается недоступной вместо ожидания чужого коммита —
+            # под нагрузкой checkout не выстраивается в очередь на локах
+            # Количества сначала суммируются по товару: две позиции
+            # одного product_id должны проверяться совокупным объемом,
+            # иначе каждая пройдет проверку по отдельности, а общее
+            # списание уведет остаток в минус
+            quantities: dict = {}
             for item in items:
-                product_id = item["product_id"]
-                quantity = item["quantity"]
+                quantities[item["product_id"]] = (
+                    quantities.get(item["product_id"], 0) + item["quantity"]
+                )
+
+            result = await self.session.execute(
+                select(Product)
+                .where(Product.id.in_(list(quantities)))
+                .with_for_update(skip_locked=True)
+            )
+            products = {product.id: product for product in result.scalars().all()}
 
-                product = await self._get_product(product_id)
+            # Сначала проверяем доступность всех товаров
+            for product_id, quantity in quantities.items():
+                product = products.get(product_id)
                 if not product:
-                    logger.warning(f"⚠️ Товар {product_id} не найден")
+                    logger.warning(
+                        f"⚠️ Товар {product_id} не найден или занят конкурентным резервом"
+                    )
+                    await self.session.rollback()
                     return False
 
                 if not product.can_order_quantity(quantity):
-                    logger.warning(f"⚠️ Недостаточно товара {product.name} для заказа {quantity}")
+                    logger.warning(
+                        f"⚠️ Недостаточно товара {product.name} для заказа {quantity}"
+                    )
+                    await self.session.rollback()
                     return False
 
-            # Если все проверки прошли, резервируем
-            for item in items:
-                product_id = item["product_id"]
-                quantity = item["quantity"]
+            # Если все проверки прошли, списываем одним UPDATE с CASE
+            # по id — один round-trip вместо запроса на каждую позицию
+            deltas = {
+                product_id: -quantity
+                for product_id, quantity in quantities.items()
+            }
 
-                product = await self._get_product(product_id)
-                await product.update_stock(-quantity)
+            await self.session.execute(
+                update(Product)
+                .where(Product.id.in_(list(deltas)))
+                .values(stock_quantity=Product.stock_quantity + case(deltas, value=Product.id))
+                .execution_options(synchronize_session=False)
+            )
 
             await self.session.commit()
+            await invalidate_low_stock_cache()
+            await invalidate_catalog_cache()
 
             logger.info(f"📦 Массово зарезервировано {len(items)} позиций")
             return True
@@ -171,15 +256,29 @@ class ProductStockService:
             True если все товары восстановлены успешно
         """
         try:
+            # Восстановление — это безусловный инкремент: проверять
+            # существование строк отдельным SELECT не нужно, несуществующий
+            # id просто не затронет ни одной строки. Один executemany-батч
+            # подготовленного UPDATE вместо 2N запросов
+            deltas: dict = {}
             for item in items:
-                product_id = item["product_id"]
-                quantity = item["quantity"]
-
-                product = await self._get_product(product_id)
-                if product:
-                    await product.update_stock(quantity)
+                deltas[item["product_id"]] = deltas.get(item["product_id"], 0) + item["quantity"]
+
+            if deltas:
+                await self.session.execute(
+                    update(Product)
+                    .where(Product.id == bindparam("pid"))
+                    .values(stock_quantity=Product.stock_quantity + bindparam("delta"))
+                    .execution_options(synchronize_session=False),
+                    [
+                        {"pid": product_id, "delta": delta}
+                        for product_id, delta in deltas.items()
+                    ]
+                )
 
             await self.session.commit()
+            await invalidate_low_stock_cache()
+            await invalidate_catalog_cache()
 
             logger.info(f"📦 Массово восстановлено {len(items)} позиций")
             return True
@@ -189,38 +288,131 @@ class ProductStockService:
             await self.session.rollback()
             return False
 
-    async def get_low_stock_products(self, threshold: Optional[int] = None) -> List[Product]:
+    async def get_low_stock_products(
+        self, threshold: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Получение товаров с низким остатком
 
+        Возвращает plain-словари колонок (без tsvector) независимо от
+        попадания в кэш — схемы валидируют их как есть. За ORM-объектами
+        есть iter_low_stock_products.
+
         Args:
             threshold: Порог низкого остатка (по умолчанию из настроек)
 
         Returns:
-            Список товаров с низким остатком
+            Список словарей с полями товара
         """
         try:
             if threshold is None:
-                threshold = marketplace_settings.LOW_STOCK_THRESHOLD
-
-            query = select(Product).where(
-                and_(
-                    Product.is_available == True,
-                    Product.stock_quantity < threshold,
-                    Product.stock_quantity > 0
-                )
-            ).order_by(Product.stock_quantity)
+                threshold = _LOW_STOCK_DEFAULT
+
+            # Список опрашивается дашбордом постоянно, меняется редко —
+            # держим его в Redis; словари валидируются схемами как есть
+            cache_key = await low_stock_cache_key(threshold)
+            if cache_key:
+                cached = await cache_get_json(cache_key)
+                if cached is not None:
+                    return cached
+
+            # lambda_stmt: форма запроса компилируется один раз,
+            # порог подставляется bind-параметром
+            query = lambda_stmt(
+                lambda: select(Product).where(
+                    and_(
+                        Product.is_available == True,
+                        Product.stock_quantity < threshold,
+                        Product.stock_quantity > 0
+                    )
+                ).order_by(Product.stock_quantity)
+            )
 
             result = await self.session.execute(query)
             products = result.scalars().all()
 
-            logger.info(f"⚠️ Товаров с низким остатком: {len(products)}")
-            return products
+            payload = [
+                {
+                    column.name: getattr(product, column.name)
+                    for column in Product.__table__.columns
+                    if column.name != "search_vector"
+                }
+                for product in products
+            ]
+
+            if cache_key:
+                await cache_set_json(cache_key, payload, LOW_STOCK_TTL_SECONDS)
+
+            logger.info(f"⚠️ Товаров с низким остатком: {len(payload)}")
+            return payload
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения товаров с низким остатком: {e}")
             return []
 
+    async def count_low_stock(self, threshold: Optional[int] = None) -> int:
+        """
+        Количество товаров с низким остатком
+
+        Для бейджей и опросов дашборда: БД возвращает одно число,
+        без материализации ORM-объектов как в get_low_stock_products.
+
+        Args:
+            threshold: Порог низкого остатка (по умолчанию из настроек)
+
+        Returns:
+            Число товаров с низким остатком
+        """
+        try:
+            if threshold is None:
+                threshold = _LOW_STOCK_DEFAULT
+
+            query = lambda_stmt(
+                lambda: select(func.count()).select_from(Product).where(
+                    and_(
+                        Product.is_available == True,
+                        Product.stock_quantity < threshold,
+                        Product.stock_quantity > 0
+                    )
+                )
+            )
+            result = await self.session.execute(query)
+            return result.scalar() or 0
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка подсчета товаров с низким остатком: {e}")
+            return 0
+
+    async def iter_low_stock_products(
+        self, threshold: Optional[int] = None
+    ) -> AsyncIterator[Product]:
+        """
+        Потоковая итерация товаров с низким остатком
+
+        Строки приходят порциями по 200 и не материализуются списком —
+        потребитель (уведомления, выгрузки) может выйти досрочно.
+
+        Args:
+            threshold: Порог низкого остатка (по умолчанию из настроек)
+
+        Yields:
+            Товары с низким остатком
+        """
+        if threshold is None:
+            threshold = _LOW_STOCK_DEFAULT
+
+        query = select(Product).where(
+            and_(
+                Product.is_available == True,
+                Product.stock_quantity < threshold,
+                Product.stock_quantity > 0
+            )
+        ).order_by(Product.stock_quantity).execution_options(yield_per=200)
+
+        result = await self.session.stream_scalars(query)
+        async for product in result:
+            yield product
+
     async def check_product_availability(self, product_id: int, quantity: int) -> dict:
         """
         Проверка доступности товара для заказа
@@ -241,25 +433,7 @@ class ProductStockService:
                     "max_quantity": 0
                 }
 
-            if not product.is_purchasable:
-                return {
-                    "available": False,
-                    "reason": "Товар недоступен для покупки",
-                    "max_quantity": 0
-                }
-
-            if not product.can_order_quantity(quantity):
-                return {
-                    "available": False,
-                    "reason": f"Недостаточное количество. Доступно: {product.get_max_available_quantity()}",
-                    "max_quantity": product.get_max_available_quantity()
-                }
-
-            return {
-                "available": True,
-                "reason": "Товар доступен",
-                "max_quantity": product.get_max_available_quantity()
-            }
+            return self.check_product_availability_for(product, quantity)
 
         except Exception as e:
             logger.error(f"❌ Ошибка проверки доступности товара {product_id}: {e}")
@@ -269,6 +443,37 @@ class ProductStockService:
                 "max_quantity": 0
             }
 
+    def check_product_availability_for(self, product: Product, quantity: int) -> dict:
+        """
+        Проверка доступности уже загруженного товара
+
+        Args:
+            product: Загруженный товар
+            quantity: Желаемое количество
+
+        Returns:
+            Словарь с информацией о доступности
+        """
+        if not product.is_purchasable:
+            return {
+                "available": False,
+                "reason": "Товар недоступен для покупки",
+                "max_quantity": 0
+            }
+
+        if not product.can_order_quantity(quantity):
+            return {
+                "available": False,
+                "reason": f"Недостаточное количество. Доступно: {product.get_max_available_quantity()}",
+                "max_quantity": product.get_max_available_quantity()
+            }
+
+        return {
+            "available": True,
+            "reason": "Товар доступен",
+            "max_quantity": product.get_max_available_quantity()
+        }
+
     async def get_stock_movements_summary(self, product_id: int) -> dict:
         """
         Получение сводки движения остатков товара
@@ -284,28 +489,40 @@ class ProductStockService:
             if not product:
                 return {}
 
-            # TODO: Добавить запросы к истории заказов для получения статистики
-            # reserved_quantity = await self._get_reserved_quantity(product_id)
-            # total_sold = await self._get_total_sold(product_id)
-
-            return {
-                "current_stock": product.stock_quantity,
-                "is_low_stock": product.is_low_stock,
-                "is_in_stock": product.is_in_stock,
-                "max_order_quantity": product.get_max_available_quantity(),
-                "reserved_quantity": 0,  # TODO
-                "total_sold": 0,  # TODO
-                "stock_status": product.stock_status
-            }
+            return self.build_stock_summary(product)
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения сводки остатков товара {product_id}: {e}")
             return {}
 
+    def build_stock_summary(self, product: Product) -> dict:
+        """
+        Сборка сводки остатков из уже загруженного товара
+
+        Args:
+            product: Загруженный товар
+
+        Returns:
+            Словарь со статистикой движения остатков
+        """
+        # TODO: Добавить запросы к истории заказов для получения статистики
+        # reserved_quantity = await self._get_reserved_quantity(product_id)
+        # total_sold = await self._get_total_sold(product_id)
+
+        return {
+            "current_stock": product.stock_quantity,
+            "is_low_stock": product.is_low_stock,
+            "is_in_stock": product.is_in_stock,
+            "max_order_quantity": product.get_max_available_quantity(),
+            "reserved_quantity": 0,  # TODO
+            "total_sold": 0,  # TODO
+            "stock_status": product.stock_status
+        }
+
     async def _get_product(self, product_id: int) -> Optional[Product]:
         """Получение товара по ID"""
         try:
-            query = select(Product).where(Product.id == product_id)
+            query = lambda_stmt(lambda: select(Product).where(Product.id == product_id))
             result = await self.session.execute(query)
             return result.scalar_one_or_none()
         except Exception as e:
@@ -321,19 +538,17 @@ class ProductStockService:
         """
         try:
             if product.is_low_stock and product.stock_quantity > 0:
-                message = (
-                    f"⚠️ *Низкий остаток товара*\n\n"
-                    f"📦 *Товар:* {product.name}\n"
-                    f"📊 *Остаток:* {product.stock_quantity} шт.\n"
-                    f"💰 *Цена:* {product.display_price}\n\n"
-                    f"Рекомендуется пополнить остаток товара."
+                # События дебаунсятся и уходят одним сообщением —
+                # Telegram API не тормозит путь коммита заказа
+                low_stock_notifier.enqueue(
+                    product.id,
+                    product.name,
+                    product.stock_quantity,
+                    product.display_price
                 )
 
-                await self.message_service.send_admin_notification(message)
-                logger.warning(f"⚠️ Отправлено уведомление о низком остатке: {product.name}")
-
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки уведомления о низком остатке: {e}")
+            logger.error(f"❌ Ошибка постановки уведомления о низком остатке: {e}")
 
     # TODO: Методы для работы с историей движения остатков
     # async def _get_reserved_quantity(self, product_id: int) -> int:
@@ -5,6 +5,7 @@
 
 from typing import List, Optional, Dict, Any
 from decimal import Decimal
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
@@ -47,6 +48,13 @@ class ProductService:
         """Создание нового товара"""
         return await self.crud.create(product_data)
 
+    async def bulk_create_products(
+        self,
+        items: List[ProductCreateSchema]
+    ) -> List[Product]:
+        """Массовое создание товаров одним запросом"""
+        return await self.crud.bulk_create(items)
+
     async def update_product(
         self,
         product_id: int,
@@ -73,7 +81,7 @@ class ProductService:
         """Получение каталога товаров с фильтрацией и пагинацией"""
         return await self.catalog.get_catalog(filters, include_hidden)
 
-    async def search_products(self, query: str, limit: int = 10) -> List[Product]:
+    async def search_products(self, query: str, limit: int = 10) -> List[Any]:
         """Поиск товаров по названию и описанию"""
         return await self.catalog.search_products(query, limit)
 
@@ -81,11 +89,11 @@ class ProductService:
         """Получение списка всех категорий товаров"""
         return await self.catalog.get_categories()
 
-    async def get_products_by_category(self, category: str, limit: int = 20) -> List[Product]:
+    async def get_products_by_category(self, category: str, limit: int = 20) -> List[Any]:
         """Получение товаров по категории"""
         return await self.catalog.get_products_by_category(category, limit)
 
-    async def get_featured_products(self, limit: int = 10) -> List[Product]:
+    async def get_featured_products(self, limit: int = 10) -> List[Any]:
         """Получение рекомендуемых товаров"""
         return await self.catalog.get_featured_products(limit)
 
@@ -111,10 +119,16 @@ class ProductService:
         """Массовое восстановление товаров"""
         return await self.stock.bulk_restore_stock(items)
 
-    async def get_low_stock_products(self, threshold: Optional[int] = None) -> List[Product]:
-        """Получение товаров с низким остатком"""
+    async def get_low_stock_products(
+        self, threshold: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Получение товаров с низким остатком (plain-словари колонок)"""
         return await self.stock.get_low_stock_products(threshold)
 
+    async def count_low_stock(self, threshold: Optional[int] = None) -> int:
+        """Количество товаров с низким остатком (без загрузки строк)"""
+        return await self.stock.count_low_stock(threshold)
+
     async def check_product_availability(self, product_id: int, quantity: int) -> dict:
         """Проверка доступности товара для заказа"""
         return await self.stock.check_product_availability(product_id, quantity)
@@ -135,6 +149,16 @@ class ProductService:
         """Сохранение изображения товара"""
         return await self.images.save_product_image(product_id, image_data, filename, optimize)
 
+    async def save_product_image_stream(
+        self,
+        product_id: int,
+        stream,
+        filename: str,
+        optimize: bool = True
+    ) -> Optional[str]:
+        """Сохранение изображения товара из потока загрузки"""
+        return await self.images.save_product_image_stream(product_id, stream, filename, optimize)
+
     async def delete_product_image(self, product_id: int) -> bool:
         """Удаление изображения товара"""
         return await self.images.delete_product_image(product_id)
@@ -162,8 +186,9 @@ class ProductService:
             if not product:
                 return None
 
-            # Проверяем доступность
-            availability = await self.check_product_availability(product_id, quantity)
+            # Проверяем доступность по уже загруженному товару,
+            # без повторного SELECT того же ряда
+            availability = self.stock.check_product_availability_for(product, quantity)
 
             return {
                 "product": product,
@@ -189,35 +214,57 @@ class ProductService:
         try:
             valid_items = []
             invalid_items = []
-            total_amount = Decimal('0.00')
+            # Сумма копится целыми копейками: int-сложение на порядок
+            # дешевле Decimal.__add__ на каждой позиции, Decimal строится
+            # один раз на выходе
+            total_cents = 0
+
+            # Все товары загружаем одним запросом; проверки доступности
+            # выполняются в Python против словаря, без повторных SELECT
+            # и без накрутки счетчика просмотров
+            products = await self._bulk_load(
+                [item.get("product_id") for item in items]
+            )
 
             for item in items:
                 product_id = item.get("product_id")
                 quantity = item.get("quantity", 1)
+                product = products.get(product_id)
 
-                product_info = await self.get_product_for_order(product_id, quantity)
-
-                if product_info and product_info["availability"]["available"]:
-                    valid_items.append({
+                if not product:
+                    invalid_items.append({
                         "product_id": product_id,
-                        "product": product_info["product"],
                         "quantity": quantity,
-                        "price": product_info["product"].price,
-                        "total_price": product_info["total_price"]
+                        "reason": "Товар не найден"
                     })
-                    total_amount += product_info["total_price"]
-                else:
+                elif not product.is_purchasable:
                     invalid_items.append({
                         "product_id": product_id,
                         "quantity": quantity,
-                        "reason": product_info["availability"]["reason"] if product_info else "Товар не найден"
+                        "reason": "Товар недоступен для покупки"
                     })
+                elif not product.can_order_quantity(quantity):
+                    invalid_items.append({
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "reason": f"Недостаточное количество. Доступно: {product.get_max_available_quantity()}"
+                    })
+                else:
+                    item_cents = product.price_cents * quantity
+                    valid_items.append({
+                        "product_id": product_id,
+                        "product": product,
+                        "quantity": quantity,
+                        "price": product.price,
+                        "total_price": Decimal(item_cents) / 100
+                    })
+                    total_cents += item_cents
 
             return {
                 "valid": len(invalid_items) == 0,
                 "valid_items": valid_items,
                 "invalid_items": invalid_items,
-                "total_amount": total_amount,
+                "total_amount": Decimal(total_cents) / 100,
                 "total_items": len(valid_items)
             }
 
@@ -231,6 +278,25 @@ class ProductService:
                 "total_items": 0
             }
 
+    async def _bulk_load(self, product_ids: List[Optional[int]]) -> Dict[int, Product]:
+        """
+        Загрузка товаров одним запросом WHERE id = ANY(...)
+
+        Args:
+            product_ids: Список ID товаров
+
+        Returns:
+            Словарь {ID: Product}
+        """
+        ids = [product_id for product_id in product_ids if product_id is not None]
+        if not ids:
+            return {}
+
+        result = await self.session.execute(
+            select(Product).where(Product.id.in_(ids))
+        )
+        return {product.id: product for product in result.scalars().all()}
+
     async def get_product_summary(self, product_id: int) -> Optional[dict]:
         """
         Получение полной сводки по товару
@@ -247,16 +313,13 @@ class ProductService:
             if not product:
                 return None
 
-            # Получаем дополнительную информацию
-            stats = await self.get_product_stats(product_id)
-            stock_summary = await self.get_stock_movements_summary(product_id)
-            image_info = await self.get_image_info(product_id)
-
+            # Все сводки строятся из уже загруженного товара —
+            # один SELECT вместо четырех на один и тот же ряд
             return {
                 "product": product,
-                "stats": stats,
-                "stock": stock_summary,
-                "images": image_info
+                "stats": self.crud.build_stats(product),
+                "stock": self.stock.build_stock_summary(product),
+                "images": self.images.build_image_info(product)
             }
 
         except Exception as e:
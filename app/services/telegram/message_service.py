@@ -39,4 +39,9 @@ class MessageService:
         """
         # TODO: Реализовать отправку через aiogram
         logger.info(f"📱 [STUB] Сообщение пользователю {user_id}: {message}")
-        return True
\ No newline at end of file
+        return True
+
+
+# Сервис без состояния — один экземпляр на процесс вместо
+# аллокации в каждом request-scoped сервисе
+message_service = MessageService()
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Буферизация счетчиков просмотров товаров
+Накапливает инкременты в памяти и пишет их в БД пачками
+"""
+
+import asyncio
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.models.product import Product
+
+# Накопленные просмотры: product_id -> количество
+_pending_views: Counter = Counter()
+
+# Интервал фонового сброса в БД
+FLUSH_INTERVAL_SECONDS = 10.0
+
+# Порог досрочного сброса: при всплеске трафика не ждем таймера
+MAX_PENDING_PRODUCTS = 200
+
+_flush_task: Optional[asyncio.Task] = None
+_early_flush_task: Optional[asyncio.Task] = None
+
+
+def record_view(product_id: int) -> None:
+    """
+    Регистрирует просмотр товара без обращения к БД
+
+    Вместо UPDATE на каждый просмотр инкремент копится в памяти
+    и сбрасывается фоновой задачей одним пакетным запросом —
+    по таймеру либо досрочно при накоплении MAX_PENDING_PRODUCTS.
+
+    Args:
+        product_id: ID товара
+    """
+    _pending_views[product_id] += 1
+
+    if len(_pending_views) >= MAX_PENDING_PRODUCTS:
+        _schedule_early_flush()
+
+
+def _schedule_early_flush() -> None:
+    """Запускает внеочередной сброс, если он еще не идет"""
+    global _early_flush_task
+
+    if _early_flush_task is not None and not _early_flush_task.done():
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Вне event loop (скрипты, тесты) — сбросит фоновый таймер
+        return
+
+    _early_flush_task = loop.create_task(_flush_once())
+
+
+async def _flush_once() -> None:
+    """Однократный сброс накопленных просмотров"""
+    from app.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        await flush_views(session)
+
+
+async def flush_views(session: AsyncSession) -> int:
+    """
+    Сбрасывает накопленные просмотры в БД одним пакетным UPDATE
+
+    Args:
+        session: Сессия базы данных
+
+    Returns:
+        int: Количество обновленных товаров
+    """
+    if not _pending_views:
+        return 0
+
+    pending = dict(_pending_views)
+    _pending_views.clear()
+
+    try:
+        # synchronize_session=False: загруженные в сессии объекты
+        # не сканируются после UPDATE, счетчик в памяти не нужен
+        await session.execute(
+            update(Product)
+            .where(Product.id == bindparam("b_product_id"))
+            .values(views_count=Product.views_count + bindparam("b_delta"))
+            .execution_options(synchronize_session=False),
+            [
+                {"b_product_id": product_id, "b_delta": delta}
+                for product_id, delta in pending.items()
+            ]
+        )
+        await session.commit()
+
+        logger.debug(f"👁 Сброшены просмотры для {len(pending)} товаров")
+        return len(pending)
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка сброса счетчиков просмотров: {e}")
+        await session.rollback()
+        # Возвращаем инкременты обратно, чтобы не потерять просмотры
+        for product_id, delta in pending.items():
+            _pending_views[product_id] += delta
+        return 0
+
+
+async def _flush_loop() -> None:
+    """Фоновый цикл периодического сброса просмотров"""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        if _pending_views:
+            async with AsyncSessionLocal() as session:
+                await flush_views(session)
+
+
+def start_view_counter() -> None:
+    """Запускает фоновую задачу сброса просмотров"""
+    global _flush_task
+
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_loop())
+        logger.info("👁 Запущен фоновый сброс счетчиков просмотров")
+
+
+async def stop_view_counter() -> None:
+    """Останавливает фоновую задачу и дописывает остаток"""
+    global _flush_task
+
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+
+    if _pending_views:
+        from app.core.database import AsyncSessionLocal
+        async with AsyncSessionLocal() as session:
+            await flush_views(session)
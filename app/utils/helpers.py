@@ -0,0 +1,33 @@
+"""
+Общие вспомогательные функции
+"""
+
+import time
+from datetime import datetime
+
+# Кеш компактного timestamp: значение меняется раз в секунду,
+# а strftime заметно дороже сравнения целых
+_timestamp_cache: tuple = (0, "")
+
+
+def compact_timestamp() -> str:
+    """
+    Возвращает текущее время в формате YYYYMMDDHHMMSS
+
+    Результат кешируется в пределах секунды: при генерации номеров
+    заказов и ID платежей пачками strftime выполняется не чаще
+    одного раза в секунду.
+
+    Returns:
+        str: Время в формате YYYYMMDDHHMMSS
+    """
+    global _timestamp_cache
+
+    now = int(time.time())
+    cached_second, cached_value = _timestamp_cache
+
+    if now != cached_second:
+        cached_value = datetime.now().strftime("%Y%m%d%H%M%S")
+        _timestamp_cache = (now, cached_value)
+
+    return cached_value
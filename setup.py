@@ -6,9 +6,17 @@
 
 import os
 import sys
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from alembic import command as alembic_command
+from alembic.config import Config as AlembicConfig
+
+
+def _alembic_config() -> AlembicConfig:
+    """Конфигурация Alembic для вызовов команд внутри процесса"""
+    return AlembicConfig("alembic.ini")
+
 
 def create_directories():
     """Создание необходимых директорий"""
@@ -41,9 +49,11 @@ def init_alembic():
     if not Path("alembic/env.py").exists():
         print("⚠️ Alembic не инициализирован, инициализируем...")
         try:
-            subprocess.run(["alembic", "init", "alembic"], check=True)
+            # Команды Alembic вызываются внутри процесса — без запуска
+            # нового интерпретатора и повторного импорта приложения
+            alembic_command.init(_alembic_config(), "alembic")
             print("✅ Alembic инициализирован")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             print(f"❌ Ошибка инициализации Alembic: {e}")
             return False
     else:
@@ -81,13 +91,14 @@ def create_first_migration():
     """Создание первой миграции"""
     try:
         print("📊 Создание первой миграции...")
-        subprocess.run([
-            "alembic", "revision", "--autogenerate",
-            "-m", "Initial migration: create all tables"
-        ], check=True)
+        alembic_command.revision(
+            _alembic_config(),
+            message="Initial migration: create all tables",
+            autogenerate=True
+        )
         print("✅ Первая миграция создана")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"❌ Ошибка создания миграции: {e}")
         return False
 
@@ -96,10 +107,10 @@ def run_migrations():
     """Применение миграций"""
     try:
         print("📊 Применение миграций...")
-        subprocess.run(["alembic", "upgrade", "head"], check=True)
+        alembic_command.upgrade(_alembic_config(), "head")
         print("✅ Миграции применены")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"❌ Ошибка применения миграций: {e}")
         return False
 
@@ -115,7 +126,7 @@ def test_import():
         from app.core.database import Base
         print("✅ База данных импортирована")
 
-        from app.db.base import *
+        from app.db import base
         print("✅ Модели импортированы")
 
         from app.main import app
@@ -136,22 +147,28 @@ def main():
     print("\n📁 Создание директорий...")
     create_directories()
 
-    # Проверка .env файла
-    print("\n⚙️ Проверка конфигурации...")
-    if not check_env_file():
-        print("❌ Настройте .env файл перед продолжением")
-        return False
+    # Самый долгий шаг — импорт приложения (тянет SQLAlchemy и все
+    # модели) — греется в фоновом потоке, пока идут дешевые проверки
+    # .env и конфигурации: общее время — максимум, а не сумма
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        import_future = executor.submit(test_import)
 
-    # Проверка конфигурации БД
-    if not check_database_config():
-        print("❌ Ошибка конфигурации базы данных")
-        return False
+        # Проверка .env файла
+        print("\n⚙️ Проверка конфигурации...")
+        if not check_env_file():
+            print("❌ Настройте .env файл перед продолжением")
+            return False
 
-    # Тестирование импортов
-    print("\n🧪 Тестирование модулей...")
-    if not test_import():
-        print("❌ Ошибка в модулях")
-        return False
+        # Проверка конфигурации БД
+        if not check_database_config():
+            print("❌ Ошибка конфигурации базы данных")
+            return False
+
+        # Тестирование импортов
+        print("\n🧪 Тестирование модулей...")
+        if not import_future.result():
+            print("❌ Ошибка в модулях")
+            return False
 
     # Создание миграции
     print("\n📊 Настройка базы данных...")